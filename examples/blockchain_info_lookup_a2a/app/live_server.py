@@ -1,17 +1,19 @@
 # app/live_server.py
 import asyncio
-import json
+import hashlib
 import logging
 import os
+import time
 import uuid
-import base64 # Needed for decoding/encoding audio
 from pathlib import Path
-import sys # To modify path for imports if needed
+import sys
+from collections import OrderedDict, deque
 from contextlib import suppress # For ignoring CancelledError during cleanup
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import orjson
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse # Use Starlette directly for FileResponse
+from starlette.responses import JSONResponse, Response
 
 # --- ADK Imports ---
 from google.adk.runners import Runner
@@ -22,14 +24,14 @@ from google.adk.events import Event, EventActions # Import EventActions for stat
 # Use alias for genai types to avoid conflicts if any
 from google.genai import types as genai_types
 
-from typing import Any, Dict, Optional
+from typing import Dict, Optional, Tuple
 
 
 # --- Configuration ---
 from dotenv import load_dotenv
-# Load .env file from the parent directory (project root)
-dotenv_path = os.path.join(os.path.dirname(__file__), '..', '.env')
-load_dotenv(dotenv_path=dotenv_path, override=True)
+# Project root (parent of app/), resolved once for locating .env
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+load_dotenv(dotenv_path=PROJECT_ROOT / '.env', override=True)
 
 # Setup logging
 logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(),
@@ -37,15 +39,15 @@ logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(),
 logger = logging.getLogger(__name__)
 
 # --- Import the Host Agent CREATION FUNCTION ---
+# Run from the example root (`python -m app.live_server` or `uvicorn app.live_server:app`)
+# so that host_agent and common_impl resolve as top-level packages.
 try:
-    project_root = Path(__file__).parent.parent
-    if str(project_root) not in sys.path:
-        sys.path.insert(0, str(project_root))
-    from host_agent.agent import create_host_agent
+    from host_agent.agent import create_host_agent, shutdown_host_agent
     logger.info("Successfully imported host_agent creation function.")
 except ImportError as e:
-     logger.critical(f"Could not import host_agent.agent: {e}. Check sys.path and ensure host_agent/agent.py exists.", exc_info=True)
+     logger.critical(f"Could not import host_agent.agent: {e}. Run from the example root (python -m app.live_server).", exc_info=True)
      create_host_agent = None # type: ignore
+     shutdown_host_agent = None # type: ignore
 
 if not create_host_agent:
     logger.critical("Host agent creation function failed to load. Exiting.")
@@ -54,10 +56,111 @@ if not create_host_agent:
 APP_NAME = "ProjectHorizonLive"
 STATIC_DIR = Path(__file__).parent / "static"
 
+# --- WebSocket Wire Protocol ---
+# Audio and fixed control signals travel as binary frames: a 1-byte type tag
+# followed by the raw payload (no base64, no JSON). JSON text frames are kept
+# only for the rare client messages ('text', 'end_of_turn', 'toggle_mock').
+FRAME_AUDIO = 0x01
+FRAME_TURN_COMPLETE = 0x02
+FRAME_INTERRUPTED = 0x03
+FRAME_TEXT = 0x04
+
+# Static control frames are built once and reused for every send.
+TURN_COMPLETE_FRAME = bytes([FRAME_TURN_COMPLETE])
+INTERRUPTED_FRAME = bytes([FRAME_INTERRUPTED])
+AUDIO_FRAME_PREFIX = bytes([FRAME_AUDIO])
+
+# Small ADK audio chunks are coalesced into one frame, flushed when the batch
+# reaches this size, when this delay (seconds) elapses, or on turn boundaries.
+# Clamped so a misconfigured value cannot leave no room for the frame tag and audio.
+AUDIO_BATCH_MAX_BYTES = max(int(os.getenv("AUDIO_BATCH_MAX_BYTES", str(16 * 1024))), 1024)
+AUDIO_BATCH_MAX_DELAY = float(os.getenv("AUDIO_BATCH_MAX_DELAY", "0.02"))
+
+# Max audio frames buffered for a slow client before the oldest are dropped.
+OUTBOUND_MAX_AUDIO_FRAMES = 64
+
+# Disconnected sessions are kept this long (seconds) so a quick reconnect resumes
+# warm state; at most SESSION_POOL_MAX_IDLE idle sessions are retained.
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "300"))
+SESSION_POOL_MAX_IDLE = 1024
+SESSION_SWEEP_INTERVAL_SECONDS = 60
+
 # --- ADK Setup ---
 session_service = InMemorySessionService()
 runner: Optional[Runner] = None # Initialize as None
 
+
+class IdleSessionPool:
+    """LRU of disconnected ADK sessions, evicted from the session service after an idle TTL.
+
+    Replaces delete-on-disconnect: a client reconnecting with the same session_id
+    within the TTL resumes its existing session instead of starting from scratch.
+    Sessions are reference counted, so a session only goes idle once every
+    socket holding it has disconnected.
+    """
+
+    def __init__(self, max_idle: int = SESSION_POOL_MAX_IDLE, idle_ttl: float = SESSION_IDLE_TTL_SECONDS):
+        self._idle: "OrderedDict[Tuple[str, str], float]" = OrderedDict() # (user_id, session_id) -> released at
+        self._active: Dict[Tuple[str, str], int] = {} # (user_id, session_id) -> connected sockets
+        self._max_idle = max_idle
+        self._idle_ttl = idle_ttl
+
+    def acquire(self, user_id: str, session_id: str) -> None:
+        """Marks a session as active so it is not evicted while connected."""
+        key = (user_id, session_id)
+        self._active[key] = self._active.get(key, 0) + 1
+        self._idle.pop(key, None)
+
+    def release(self, user_id: str, session_id: str) -> None:
+        """Drops one connection; the session goes idle once none remain.
+
+        The least recently released idle sessions are evicted beyond max_idle.
+        """
+        key = (user_id, session_id)
+        remaining = self._active.get(key, 0) - 1
+        if remaining > 0:
+            self._active[key] = remaining
+            return
+        self._active.pop(key, None)
+        self._idle[key] = time.monotonic()
+        self._idle.move_to_end(key)
+        while len(self._idle) > self._max_idle:
+            (old_user_id, old_session_id), _ = self._idle.popitem(last=False)
+            self._delete(old_user_id, old_session_id)
+
+    def evict_expired(self) -> int:
+        """Deletes sessions idle for longer than the TTL. Returns the number evicted."""
+        cutoff = time.monotonic() - self._idle_ttl
+        evicted = 0
+        while self._idle:
+            (user_id, session_id), released_at = next(iter(self._idle.items()))
+            if released_at > cutoff:
+                break
+            del self._idle[(user_id, session_id)]
+            self._delete(user_id, session_id)
+            evicted += 1
+        return evicted
+
+    def _delete(self, user_id: str, session_id: str) -> None:
+        try:
+            session_service.delete_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+            logger.info(f"Idle session removed from service: {session_id}")
+        except Exception as del_err:
+            logger.warning(f"[{session_id}] Error deleting idle session: {del_err}")
+
+
+idle_sessions = IdleSessionPool()
+session_sweeper_task: Optional[asyncio.Task] = None
+
+
+async def sweep_idle_sessions():
+    """Periodically evicts sessions whose idle TTL has expired."""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+        evicted = idle_sessions.evict_expired()
+        if evicted:
+            logger.info(f"Evicted {evicted} idle session(s).")
+
 # --- FastAPI App ---
 app = FastAPI(title="Bitcoin Voice Assistant") # Create app instance early
 
@@ -86,12 +189,107 @@ async def initialize_adk_system():
 # --- FastAPI Startup Event ---
 @app.on_event("startup")
 async def startup_event():
+    global session_sweeper_task
     logger.info("FastAPI server starting up...")
     await initialize_adk_system()
     if not runner:
         logger.critical("ADK Runner failed to initialize during startup. Server might not function correctly.")
     else:
         logger.info("ADK System initialized successfully within FastAPI startup.")
+    session_sweeper_task = asyncio.create_task(sweep_idle_sessions())
+
+# --- FastAPI Shutdown Event ---
+@app.on_event("shutdown")
+async def shutdown_event():
+    if session_sweeper_task and not session_sweeper_task.done():
+        session_sweeper_task.cancel()
+        with suppress(asyncio.CancelledError): await session_sweeper_task
+    if shutdown_host_agent:
+        await shutdown_host_agent()
+
+
+class OutboundFrameQueue:
+    """Bounded buffer of outbound WebSocket frames between the ADK consumer and the socket writer.
+
+    Keeps a slow client from stalling the ADK event drain. When the buffer is full
+    the oldest audio frame is dropped (stale audio is worthless); control frames
+    (turn_complete, interrupted) are never dropped.
+    """
+
+    def __init__(self, max_audio_frames: int = OUTBOUND_MAX_AUDIO_FRAMES):
+        self._frames: deque[tuple[bytes, bool]] = deque() # (frame, is_audio)
+        self._audio_frames = 0
+        self._max_audio_frames = max_audio_frames
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped_audio_frames = 0
+
+    def put_audio(self, frame: bytes) -> None:
+        if self._audio_frames >= self._max_audio_frames:
+            for i, (_, is_audio) in enumerate(self._frames):
+                if is_audio:
+                    del self._frames[i]
+                    self._audio_frames -= 1
+                    self.dropped_audio_frames += 1
+                    break
+        self._frames.append((frame, True))
+        self._audio_frames += 1
+        self._ready.set()
+
+    def put_control(self, frame: bytes) -> None:
+        self._frames.append((frame, False))
+        self._ready.set()
+
+    def clear_audio(self) -> None:
+        """Discards all queued audio frames, keeping pending control frames."""
+        if self._audio_frames:
+            self._frames = deque(item for item in self._frames if not item[1])
+            self._audio_frames = 0
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[bytes]:
+        """Returns the next frame, or None once the queue is closed and drained."""
+        while not self._frames:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        frame, is_audio = self._frames.popleft()
+        if is_audio:
+            self._audio_frames -= 1
+        return frame
+
+
+async def run_until_first_completes(*coros) -> None:
+    """Runs the bridge coroutines concurrently; once one finishes, the others are cancelled.
+
+    Uses asyncio.TaskGroup on Python 3.11+ so cancellation and awaiting of the
+    remaining tasks is scoped to the group. Falls back to asyncio.wait otherwise.
+    """
+    if sys.version_info >= (3, 11):
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(coro) for coro in coros]
+
+            def cancel_siblings(finished: asyncio.Task) -> None:
+                for task in tasks:
+                    if task is not finished:
+                        task.cancel()
+
+            for task in tasks:
+                task.add_done_callback(cancel_siblings)
+        return
+
+    tasks = [asyncio.create_task(coro) for coro in coros]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError): await task
 
 
 # --- WebSocket Endpoint ---
@@ -104,8 +302,6 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
 
     live_events: Optional[asyncio.StreamReader] = None
     live_request_queue: Optional[LiveRequestQueue] = None
-    adk_run_task: Optional[asyncio.Task] = None
-    client_listener_task: Optional[asyncio.Task] = None
     adk_session: Optional[Session] = None
 
     if not runner:
@@ -113,7 +309,10 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         await websocket.close(code=1011, reason="Server not ready (Runner missing)")
         return
 
+    session_acquired = False
     try:
+        idle_sessions.acquire(user_id, session_id)
+        session_acquired = True
         adk_session = session_service.get_session(
             app_name=APP_NAME, user_id=user_id, session_id=session_id
         )
@@ -134,58 +333,129 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         )
         logger.info(f"ADK run_live started for session {session_id}")
 
+        outbound = OutboundFrameQueue()
+
         async def adk_to_client():
-            nonlocal adk_session
-            logger.debug(f"[{session_id}] ADK -> Client task started.")
+            logger.debug("[%s] ADK -> Client task started.", session_id)
+            debug_enabled = logger.isEnabledFor(logging.DEBUG) # Checked once; this loop runs per audio chunk
             audio_chunk_counter = 0
+            loop = asyncio.get_running_loop()
+            # Pending audio frame: tag byte followed by coalesced PCM chunks, written
+            # into one preallocated scratch buffer that is reused for every batch.
+            audio_scratch = bytearray(AUDIO_BATCH_MAX_BYTES)
+            audio_scratch[0] = FRAME_AUDIO
+            audio_view = memoryview(audio_scratch)
+            audio_len = 1
+            flush_deadline = 0.0
+
+            def flush_audio():
+                nonlocal audio_len
+                if audio_len > 1:
+                    outbound.put_audio(bytes(audio_view[:audio_len]))
+                    audio_len = 1
+
+            def buffer_audio(chunk: bytes):
+                nonlocal audio_len, flush_deadline
+                if audio_len + len(chunk) > AUDIO_BATCH_MAX_BYTES:
+                    flush_audio()
+                    if 1 + len(chunk) > AUDIO_BATCH_MAX_BYTES:
+                        outbound.put_audio(AUDIO_FRAME_PREFIX + chunk) # Oversized chunk, send as-is
+                        return
+                if audio_len == 1:
+                    flush_deadline = loop.time() + AUDIO_BATCH_MAX_DELAY
+                audio_view[audio_len:audio_len + len(chunk)] = chunk
+                audio_len += len(chunk)
+
+            def forward_audio(chunk: bytes):
+                nonlocal audio_chunk_counter
+                audio_chunk_counter += 1
+                if audio_chunk_counter == 1:
+                    logger.info(f"[{session_id}] Receiving audio stream from ADK...")
+                if debug_enabled:
+                    logger.debug("[%s] Buffering audio chunk #%d (%d bytes) for client.", session_id, audio_chunk_counter, len(chunk))
+                buffer_audio(chunk)
+
+            event_iter = live_events.__aiter__() # type: ignore
+            next_event: Optional[asyncio.Future] = None
             try:
-                async for event in live_events: # type: ignore
-                    logger.debug(f"[{session_id}] Raw ADK Event Received: {event}")
-                    message_to_send = None
+                while True:
+                    if next_event is None:
+                        next_event = asyncio.ensure_future(event_iter.__anext__())
+                    if audio_len > 1:
+                        # Wait for the next event only until the batch deadline; the
+                        # pending __anext__ is kept (not cancelled) across the flush.
+                        done, _ = await asyncio.wait({next_event}, timeout=max(0.0, flush_deadline - loop.time()))
+                        if not done:
+                            flush_audio()
+                            continue
+                    try:
+                        event = await next_event
+                    except StopAsyncIteration:
+                        flush_audio()
+                        break
+                    next_event = None
+
+                    if debug_enabled:
+                        # Scalar metadata only: str(event) would render inline audio bytes.
+                        logger.debug("[%s] ADK event id=%s author=%s partial=%s turn_complete=%s", session_id, getattr(event, 'id', None), event.author, event.partial, event.turn_complete)
+
+                    # Bind the first part's inline data once per event.
+                    content = event.content
+                    parts = content.parts if content else None
+                    first_part = parts[0] if parts else None
+                    inline_data = first_part.inline_data if first_part else None
+                    mime_type = (inline_data.mime_type or "") if inline_data else ""
+                    actions = event.actions
+                    has_action_delta = bool(actions and (actions.state_delta or actions.artifact_delta))
+                    interrupted = getattr(event, 'interrupted', False)
+
+                    # Fast path: the bulk of a live session is plain streamed audio
+                    # with no turn/interrupt signal and nothing to persist.
+                    if mime_type.startswith("audio/") and not (event.turn_complete or interrupted or has_action_delta):
+                        forward_audio(inline_data.data)
+                        continue
+
                     event_processed = False
 
-                    if hasattr(event, 'interrupted') and event.interrupted:
+                    if interrupted:
                          logger.info(f"[{session_id}] Received interruption signal from ADK.")
-                         await websocket.send_json({"type": "interrupted"})
+                         audio_len = 1 # Buffered audio is stale once interrupted
+                         outbound.clear_audio()
+                         outbound.put_control(INTERRUPTED_FRAME)
                          logger.info(f"[{session_id}] Sent 'interrupted' signal to client.")
 
-                    if event.content and event.content.parts:
-                         part = event.content.parts[0]
-                         if part.inline_data and part.inline_data.mime_type.startswith("audio/"):
-                              audio_bytes = part.inline_data.data
-                              audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-                              message_to_send = {"type": "audio", "data": audio_b64}
-                              audio_chunk_counter += 1
-                              if audio_chunk_counter == 1:
-                                  logger.info(f"[{session_id}] Receiving audio stream from ADK...")
-                              logger.debug(f"[{session_id}] Sending audio chunk #{audio_chunk_counter} ({len(audio_bytes)} bytes) to client.")
-                              await websocket.send_json(message_to_send)
-                              event_processed = True
+                    if mime_type.startswith("audio/"):
+                         forward_audio(inline_data.data)
+                         event_processed = True
 
                     if event.turn_complete:
                         if audio_chunk_counter > 0:
                             logger.info(f"[{session_id}] Finished sending {audio_chunk_counter} audio chunks.")
                         audio_chunk_counter = 0
-                        await websocket.send_json({"type": "turn_complete"})
+                        flush_audio()
+                        outbound.put_control(TURN_COMPLETE_FRAME)
                         logger.info(f"[{session_id}] Sent turn_complete signal to client.")
                         event_processed = True
 
-                    if not event_processed and not event.actions:
-                        is_tool_event = bool(event.get_function_calls() or event.get_function_responses())
+                    if not event_processed and not actions:
+                        function_calls = event.get_function_calls()
+                        function_responses = event.get_function_responses()
+                        is_tool_event = bool(function_calls or function_responses)
                         if not is_tool_event:
-                             logger.debug(f"[{session_id}] Skipping event: Author={event.author}, Partial={event.partial}, Content Type={type(event.content.parts[0]).__name__ if event.content and event.content.parts else 'None'}")
+                             if debug_enabled:
+                                 logger.debug("[%s] Skipping event: Author=%s, Partial=%s, Content Type=%s", session_id, event.author, event.partial, type(first_part).__name__ if first_part else 'None')
                         else:
-                             if event.get_function_calls():
-                                 logger.debug(f"[{session_id}] Processing event: Tool Call Requested by {event.author}")
-                             elif event.get_function_responses():
-                                 logger.debug(f"[{session_id}] Processing event: Tool Response from {event.author}")
+                             if function_calls:
+                                 logger.debug("[%s] Processing event: Tool Call Requested by %s", session_id, event.author)
+                             elif function_responses:
+                                 logger.debug("[%s] Processing event: Tool Response from %s", session_id, event.author)
 
-                    if event.actions and (event.actions.state_delta or event.actions.artifact_delta):
-                        logger.debug(f"[{session_id}] Appending event with actions: {event.actions}")
+                    if has_action_delta:
+                        logger.debug("[%s] Appending event with actions: %s", session_id, actions)
                         if adk_session:
+                            # append_event applies the delta to adk_session in place; no reload needed.
                             session_service.append_event(adk_session, event)
-                            adk_session = session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id) # type: ignore
-                            logger.debug(f"[{session_id}] Session state possibly updated by event actions.")
+                            logger.debug("[%s] Session state possibly updated by event actions.", session_id)
                         else:
                             logger.warning(f"[{session_id}] adk_session is None, cannot append event actions.")
             except WebSocketDisconnect:
@@ -195,27 +465,61 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             except Exception as e:
                  logger.error(f"[{session_id}] Error in ADK -> Client task: {e}", exc_info=True)
             finally:
-                 logger.debug(f"[{session_id}] ADK -> Client task finished.")
+                 if next_event is not None and not next_event.done():
+                     next_event.cancel()
+                 outbound.close()
+                 logger.debug("[%s] ADK -> Client task finished.", session_id)
+
+        async def client_writer():
+            logger.debug("[%s] Client writer task started.", session_id)
+            try:
+                while (frame := await outbound.get()) is not None:
+                    await websocket.send_bytes(frame)
+            except WebSocketDisconnect:
+                 logger.info(f"[{session_id}] WebSocket disconnected while sending to client.")
+            except asyncio.CancelledError:
+                 logger.info(f"[{session_id}] Client writer task cancelled.")
+            except Exception as e:
+                 logger.error(f"[{session_id}] Error in client writer task: {e}", exc_info=True)
+            finally:
+                 if outbound.dropped_audio_frames:
+                     logger.warning(f"[{session_id}] Dropped {outbound.dropped_audio_frames} stale audio frame(s) for a slow client.")
+                 logger.debug("[%s] Client writer task finished.", session_id)
 
         async def client_to_adk():
-            nonlocal adk_session
-            logger.debug(f"[{session_id}] Client -> ADK task started.")
+            logger.debug("[%s] Client -> ADK task started.", session_id)
             try:
                 while True:
-                    data = await websocket.receive_json()
-                    message_type = data.get("type")
-                    logger.debug(f"[{session_id}] Received '{message_type}' from client.")
-
-                    if message_type == "audio":
-                        audio_b64 = data.get("data", "")
-                        if audio_b64:
-                            audio_bytes = base64.b64decode(audio_b64)
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        raise WebSocketDisconnect(message.get("code", 1000))
+
+                    frame = message.get("bytes")
+                    if frame is not None:
+                        # Binary frame: 1-byte tag + raw payload, passed straight to ADK.
+                        if frame and frame[0] == FRAME_AUDIO:
+                            audio_bytes = frame[1:]
                             if audio_bytes:
                                 audio_blob = genai_types.Blob(mime_type='audio/pcm', data=audio_bytes)
                                 if live_request_queue: live_request_queue.send_realtime(blob=audio_blob)
                             else:
                                 logger.warning(f"[{session_id}] Received empty audio data from client.")
-                    elif message_type == "text":
+                        else:
+                            logger.warning(f"[{session_id}] Received binary frame with unknown tag from client.")
+                        continue
+
+                    try:
+                        data = orjson.loads(message["text"])
+                    except orjson.JSONDecodeError:
+                        logger.warning(f"[{session_id}] Ignoring malformed JSON text frame from client.")
+                        continue
+                    if not isinstance(data, dict):
+                        logger.warning(f"[{session_id}] Ignoring non-object JSON text frame from client.")
+                        continue
+                    message_type = data.get("type")
+                    logger.debug("[%s] Received '%s' from client.", session_id, message_type)
+
+                    if message_type == "text":
                         text_data = data.get("data", "")
                         if text_data:
                             logger.info(f"[{session_id}] Sending text '{text_data}' to ADK.")
@@ -223,7 +527,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                             if live_request_queue: live_request_queue.send_content(content=content)
                     elif message_type == "end_of_turn":
                         logger.info(f"[{session_id}] Client indicated end of turn.")
-                        logger.debug(f"[{session_id}] End of turn signal received, letting Gemini API infer turn end.")
+                        logger.debug("[%s] End of turn signal received, letting Gemini API infer turn end.", session_id)
                     elif message_type == "toggle_mock":
                          mock_value = data.get("value", False)
                          logger.info(f"[{session_id}] Setting mock_a2a_calls state to: {mock_value}")
@@ -236,8 +540,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                          )
                          if adk_session:
                              session_service.append_event(adk_session, state_update_event)
-                             adk_session = session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id) # type: ignore
-                             logger.info(f"[{session_id}] State 'mock_a2a_calls' updated via event to: {adk_session.state.get('mock_a2a_calls')}") # type: ignore
+                             logger.info(f"[{session_id}] State 'mock_a2a_calls' updated via event to: {adk_session.state.get('mock_a2a_calls')}")
                          else:
                              logger.warning(f"[{session_id}] adk_session is None, cannot update mock_a2a_calls state.")
                     else:
@@ -252,22 +555,16 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 logger.error(f"[{session_id}] Error in client listener task: {e_inner}", exc_info=True)
                 if live_request_queue: live_request_queue.close()
             finally:
-                logger.debug(f"[{session_id}] Client -> ADK task finished.")
+                logger.debug("[%s] Client -> ADK task finished.", session_id)
 
         logger.info(f"[{session_id}] Starting ADK <-> WebSocket bridge tasks.")
-        adk_run_task = asyncio.create_task(adk_to_client())
-        client_listener_task = asyncio.create_task(client_to_adk())
-        done, pending = await asyncio.wait(
-            [adk_run_task, client_listener_task],
-            return_when=asyncio.FIRST_COMPLETED,
-        )
-        logger.info(f"[{session_id}] One of the bridge tasks completed ({len(done)} done, {len(pending)} pending).")
+        async def adk_to_websocket():
+            # adk_to_client closes `outbound` when it ends; the writer then drains the
+            # remaining frames (last audio batch, turn_complete) before finishing.
+            await asyncio.gather(adk_to_client(), client_writer())
 
-        for task in pending:
-            if not task.done():
-                logger.debug(f"[{session_id}] Cancelling pending bridge task...")
-                task.cancel()
-                with suppress(asyncio.CancelledError): await task
+        await run_until_first_completes(adk_to_websocket(), client_to_adk())
+        logger.info(f"[{session_id}] ADK <-> WebSocket bridge tasks finished.")
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket client disconnected gracefully for session: {session_id}")
@@ -280,19 +577,15 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     finally:
         logger.info(f"Performing final cleanup for session: {session_id}")
         if live_request_queue:
-             logger.debug(f"[{session_id}] Closing live request queue in final cleanup.")
+             logger.debug("[%s] Closing live request queue in final cleanup.", session_id)
              try:
                  live_request_queue.close()
              except Exception as q_close_err:
                  logger.warning(f"[{session_id}] Error closing LiveRequestQueue: {q_close_err}")
-        if adk_run_task and not adk_run_task.done(): adk_run_task.cancel()
-        if client_listener_task and not client_listener_task.done(): client_listener_task.cancel()
-        if adk_session:
-            try:
-                session_service.delete_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
-                logger.info(f"Session removed from service: {session_id}")
-            except Exception as del_err:
-                 logger.warning(f"[{session_id}] Error deleting session: {del_err}")
+        if session_acquired:
+            # Keep the session warm for a quick reconnect; the sweeper evicts it after the idle TTL.
+            idle_sessions.release(user_id, session_id)
+            logger.info(f"Session released to idle pool: {session_id}")
         logger.info(f"WebSocket connection fully closed for session: {session_id}")
 
 
@@ -300,32 +593,30 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
 if not STATIC_DIR.is_dir():
     logger.error(f"Static directory not found at {STATIC_DIR}. UI will not be served.")
 else:
-    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+    app.mount("/static", StaticFiles(directory=STATIC_DIR, html=False), name="static")
     logger.info(f"Serving static files from {STATIC_DIR}")
 
+    # index.html is read once at import; it only changes on redeploy.
+    INDEX_PATH = STATIC_DIR / "index.html"
+    INDEX_BYTES: Optional[bytes] = INDEX_PATH.read_bytes() if INDEX_PATH.is_file() else None
+    INDEX_ETAG = f'"{hashlib.blake2b(INDEX_BYTES, digest_size=16).hexdigest()}"' if INDEX_BYTES is not None else None
+    if INDEX_BYTES is None:
+        logger.error("index.html not found in static directory.")
+
     @app.get("/")
-    async def read_index():
-        index_path = STATIC_DIR / "index.html"
-        if not index_path.is_file():
-            logger.error("index.html not found in static directory.")
-            return {"error": "index.html not found"}, 404
+    async def read_index(request: Request):
+        if INDEX_BYTES is None:
+            return JSONResponse({"error": "index.html not found"}, status_code=404)
+        headers = {"ETag": INDEX_ETAG, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == INDEX_ETAG:
+            return Response(status_code=304, headers=headers)
         logger.debug("Serving index.html")
-        return FileResponse(str(index_path))
+        return Response(INDEX_BYTES, media_type="text/html", headers=headers)
 
 # --- Server Startup (for running directly) ---
 # The `main_async_startup` is now only needed if you run this file directly.
 # Uvicorn will handle app creation and startup events when run as `uvicorn app.live_server:app`
 if __name__ == "__main__":
-    project_root_path = Path(__file__).parent.parent
-    if str(project_root_path) not in sys.path:
-        sys.path.insert(0, str(project_root_path))
-        logger.debug(f"Added project root to sys.path for direct execution: {project_root_path}")
-
-    LIVE_SERVER_MODEL_ID = os.getenv("LIVE_SERVER_MODEL")
-    if not LIVE_SERVER_MODEL_ID:
-        logger.warning("LIVE_SERVER_MODEL env var not set. Defaulting to 'gemini-2.0-flash-exp'.")
-        LIVE_SERVER_MODEL_ID = "gemini-2.0-flash-exp"
-
     LIVE_SERVER_HOST = os.getenv("LIVE_SERVER_HOST")
     if LIVE_SERVER_HOST is None:
         logger.critical("CRITICAL: LIVE_SERVER_HOST env var not set.")
@@ -342,14 +633,43 @@ if __name__ == "__main__":
         logger.critical(f"Invalid LIVE_SERVER_PORT: '{raw_port}'. Must be integer.")
         sys.exit(1)
 
+    # Sessions live in a per-process InMemorySessionService, so with more than one
+    # worker a reverse proxy must route each /ws/{session_id} to the same worker
+    # (e.g. nginx `hash $uri consistent`).
+    raw_workers = os.getenv("WEB_CONCURRENCY", "1")
+    try:
+        WEB_CONCURRENCY = max(1, int(raw_workers))
+    except ValueError:
+        logger.critical(f"Invalid WEB_CONCURRENCY: '{raw_workers}'. Must be integer.")
+        sys.exit(1)
+
     # When running directly, we need to manually trigger the startup event logic
     # (or Uvicorn does it if 'app' object is passed)
     # Uvicorn will call startup events registered on the app object.
     # No need to call initialize_adk_system() directly here if Uvicorn is used.
-    logger.info(f"Starting Bitcoin Voice Assistant Live Server (direct run) on http://{LIVE_SERVER_HOST}:{LIVE_SERVER_PORT}")
+    # Prefer uvloop for the event loop (not available on Windows); httptools is
+    # installed with uvicorn[standard].
+    try:
+        import uvloop # noqa: F401
+        event_loop_impl = "uvloop"
+    except ImportError:
+        logger.warning("uvloop not available. Falling back to the default asyncio event loop.")
+        event_loop_impl = "asyncio"
+
+    logger.info(f"Starting Bitcoin Voice Assistant Live Server (direct run) on http://{LIVE_SERVER_HOST}:{LIVE_SERVER_PORT} with {WEB_CONCURRENCY} worker(s)")
     try:
         import uvicorn
-        uvicorn.run(app, host=LIVE_SERVER_HOST, port=LIVE_SERVER_PORT, log_level="info")
+        uvicorn.run(
+            # Multiple workers require an import string so each process loads its own app.
+            app if WEB_CONCURRENCY == 1 else "app.live_server:app",
+            host=LIVE_SERVER_HOST,
+            port=LIVE_SERVER_PORT,
+            workers=WEB_CONCURRENCY,
+            loop=event_loop_impl,
+            http="httptools",
+            ws="websockets",
+            log_level="info",
+        )
     except ImportError:
          logger.critical("Uvicorn not installed. Run 'pip install uvicorn[standard]'.")
     except Exception as startup_error:
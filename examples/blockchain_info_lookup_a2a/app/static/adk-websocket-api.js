@@ -8,9 +8,17 @@ const EventEmitter = window.EventEmitter3;
 // --- into ./audio/ and ./utils/                           ---
 import { AudioRecorder } from './audio/audio-recorder.js';
 import { AudioStreamer } from './audio/audio-streamer.js';
-import { base64ToArrayBuffer } from './utils/utils.js';
 // ---------------------------------------------------------------
 
+// Binary frame type tags (first byte of every binary WebSocket message).
+// Must match FRAME_* constants in app/live_server.py.
+const FRAME_AUDIO = 0x01;
+const FRAME_TURN_COMPLETE = 0x02;
+const FRAME_INTERRUPTED = 0x03;
+const FRAME_TEXT = 0x04;
+
+const textDecoder = new TextDecoder();
+
 class ADKWebSocketAPI extends EventEmitter {
     constructor() {
         super(); // Initialize EventEmitter
@@ -82,7 +90,12 @@ class ADKWebSocketAPI extends EventEmitter {
 
     // *** CHANGE 2: Modify connect to call initializeAudio ***
     async connect() { // Make connect async
-        this.sessionID = uuid.v4();
+        // One session ID per page (kept across reloads in sessionStorage), so a
+        // reconnect resumes the server-side session instead of starting a new one.
+        if (!this.sessionID) {
+            this.sessionID = sessionStorage.getItem('adkSessionID') || uuid.v4();
+            sessionStorage.setItem('adkSessionID', this.sessionID);
+        }
         const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
         // Use the port the current page is served from
         const backendPort = window.location.port || (wsProtocol === "wss:" ? "443" : "80"); 
@@ -101,6 +114,7 @@ class ADKWebSocketAPI extends EventEmitter {
 
             try {
                  this.ws = new WebSocket(wsEndpoint);
+                 this.ws.binaryType = 'arraybuffer'; // Audio arrives as tagged binary frames
             } catch (error) {
                  console.error("WebSocket creation failed:", error);
                  this._logToUI(`WebSocket Error: ${error.message}`, "error");
@@ -141,17 +155,25 @@ class ADKWebSocketAPI extends EventEmitter {
 
             this.ws.onmessage = async (event) => { // Keep async
                 try {
-                    const message = JSON.parse(event.data);
-                    console.log(`WebSocket Message Received: Type=${message.type}, ContextState=${this.audioContext?.state}`); // Log type and state
+                    if (!(event.data instanceof ArrayBuffer)) {
+                        // JSON text frames are only used for rare server messages
+                        const message = JSON.parse(event.data);
+                        if (message.type === 'error') {
+                            console.error("Received error message:", message.data);
+                            this._logToUI(`Server Error: ${message.data}`, "error");
+                        }
+                        return;
+                    }
 
-                    if (message.type === 'audio') {
+                    const frame = new Uint8Array(event.data);
+                    const tag = frame[0];
+
+                    if (tag === FRAME_AUDIO) {
+                        const audioBytes = frame.subarray(1);
                         const canPlay = !!this.audioStreamer && this.audioContext?.state === 'running';
-                        console.log(`Audio message received. Can play? ${canPlay}`); // Log the check result
 
                         if (canPlay) {
-                            const audioBytes = base64ToArrayBuffer(message.data);
-                            console.log(`Queuing ${audioBytes.byteLength} audio bytes for playback.`);
-                            this.audioStreamer.addPCM16(new Uint8Array(audioBytes));
+                            this.audioStreamer.addPCM16(audioBytes);
                         } else {
                              console.warn("Audio streamer not ready or context not running. Cannot play audio chunk.", { streamer: !!this.audioStreamer, contextState: this.audioContext?.state });
                              // Try resuming again *just in case*
@@ -162,27 +184,26 @@ class ADKWebSocketAPI extends EventEmitter {
                                  // If resume succeeded, maybe try adding the chunk again? Careful about race conditions.
                                  if (this.audioContext.state === 'running' && this.audioStreamer) {
                                      console.log("Context resumed, retrying addPCM16 for the missed chunk.");
-                                     const audioBytes = base64ToArrayBuffer(message.data);
-                                     this.audioStreamer.addPCM16(new Uint8Array(audioBytes));
+                                     this.audioStreamer.addPCM16(audioBytes);
                                  }
                              }
                         }
-                    } else if (message.type === 'text') {
-                        console.log("Received text message:", message.data);
-                        this._logToUI(message.data, "agent");
-                    } else if (message.type === 'interrupted') {
+                    } else if (tag === FRAME_TEXT) {
+                        const text = textDecoder.decode(frame.subarray(1));
+                        console.log("Received text message:", text);
+                        this._logToUI(text, "agent");
+                    } else if (tag === FRAME_INTERRUPTED) {
                         console.log("Received interruption signal from server.");
                         if (this.audioStreamer) {
                             console.log("Stopping audio streamer due to interruption.");
                             this.audioStreamer.stop();
                         }
                         this._logToUI("Agent response interrupted.", "info");
-                    } else if (message.type === 'turn_complete') {
+                    } else if (tag === FRAME_TURN_COMPLETE) {
                          console.log("Received turn_complete message.");
                          if (this.audioStreamer) this.audioStreamer.complete();
-                    } else if (message.type === 'error') {
-                        console.error("Received error message:", message.data);
-                        this._logToUI(`Server Error: ${message.data}`, "error");
+                    } else {
+                        console.warn(`Received binary frame with unknown tag: ${tag}`);
                     }
 
                 } catch (error) {
@@ -234,9 +255,16 @@ class ADKWebSocketAPI extends EventEmitter {
         }
     }
 
-    sendAudioChunk(base64Audio) {
+    sendAudioChunk(frameBuffer) {
         if (!this.isMuted) { // Only send if not muted
-             this._sendMessage({ type: 'audio', data: base64Audio });
+            if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+                // Tagged binary frame: [FRAME_AUDIO, ...raw PCM16 bytes]. The recorder
+                // reserves the first byte, so the tag is written in place (no copy).
+                new Uint8Array(frameBuffer)[0] = FRAME_AUDIO;
+                this.ws.send(frameBuffer);
+            } else {
+                console.error('WebSocket is not open. Cannot send audio.');
+            }
         }
     }
 
@@ -273,9 +301,9 @@ class ADKWebSocketAPI extends EventEmitter {
             this.micButton.querySelector('.material-symbols-outlined').textContent = 'stop_circle'; // Change icon
 
             // Send audio chunks
-            this.audioRecorder.on('data', (base64Data) => {
+            this.audioRecorder.on('data', (frameBuffer) => {
                 if (this.isConnected && !this.isMuted) { // Check connection and mute state
-                    this.sendAudioChunk(base64Data);
+                    this.sendAudioChunk(frameBuffer);
                 }
             });
         } catch (error) {
@@ -18,16 +18,6 @@ import { audioContext } from "../utils/utils.js";
 import { createWorkletFromSrc, registeredWorklets } from "./audioworklet-registry.js";
 import AudioRecordingWorklet from "./audio-recording-worklet.js";
 
-function arrayBufferToBase64(buffer) {
-  var binary = "";
-  var bytes = new Uint8Array(buffer);
-  var len = bytes.byteLength;
-  for (var i = 0; i < len; i++) {
-    binary += String.fromCharCode(bytes[i]);
-  }
-  return window.btoa(binary);
-}
-
 export class AudioRecorder extends EventEmitter3 {
   constructor() {
     super();
@@ -71,11 +61,11 @@ export class AudioRecorder extends EventEmitter3 {
       this.recordingWorklet = registry[workletName].node;
 
       this.recordingWorklet.port.onmessage = async (ev) => {
-        const arrayBuffer = ev.data.data.int16arrayBuffer;
+        const frameBuffer = ev.data.data.frameBuffer;
 
-        if (arrayBuffer) {
-          const arrayBufferString = arrayBufferToBase64(arrayBuffer);
-          this.emit("data", arrayBufferString);
+        if (frameBuffer) {
+          // Emit [reserved tag byte, ...PCM16]; the WebSocket layer fills in the tag
+          this.emit("data", frameBuffer);
         }
       };
       this.source.connect(this.recordingWorklet);
@@ -36,12 +36,17 @@ class AudioProcessingWorklet extends AudioWorkletProcessor {
   }
 
   sendAndClearBuffer() {
+    // Copy the PCM16 bytes after one reserved leading byte, so the main thread
+    // can write the binary frame tag in place and send without another copy.
+    const pcm = new Uint8Array(this.buffer.buffer, 0, this.bufferWriteIndex * 2);
+    const frame = new Uint8Array(pcm.length + 1);
+    frame.set(pcm, 1);
     this.port.postMessage({
       event: "chunk",
       data: {
-        int16arrayBuffer: this.buffer.slice(0, this.bufferWriteIndex).buffer,
+        frameBuffer: frame.buffer,
       },
-    });
+    }, [frame.buffer]);
     this.bufferWriteIndex = 0;
   }
 
@@ -32,7 +32,8 @@ export class AudioStreamer {
     addPCM16(chunk) {
       // Convert incoming PCM16 data to float32
       const float32Array = new Float32Array(chunk.length / 2);
-      const dataView = new DataView(chunk.buffer);
+      // Honour the view's offset so callers can pass a subarray without copying.
+      const dataView = new DataView(chunk.buffer, chunk.byteOffset, chunk.byteLength);
 
       for (let i = 0; i < chunk.length / 2; i++) {
         try {
@@ -1,6 +1,7 @@
 import httpx
+import orjson
 from httpx_sse import connect_sse
-from typing import Any, AsyncIterable
+from typing import Any, AsyncIterable, Optional
 from common_impl.types import (
     AgentCard,
     GetTaskRequest,
@@ -23,19 +24,31 @@ import json
 
 
 class A2AClient:
-    def __init__(self, agent_card: AgentCard = None, url: str = None):
+    def __init__(
+        self,
+        agent_card: AgentCard = None,
+        url: str = None,
+        httpx_client: Optional[httpx.AsyncClient] = None,
+    ):
         if agent_card:
             self.url = agent_card.url
         elif url:
             self.url = url
         else:
             raise ValueError("Must provide either agent_card or url")
+        # Optional shared client; its lifecycle is owned by the caller. Without one,
+        # a short-lived client is opened per request.
+        self.httpx_client = httpx_client
 
     async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
         # self.url += "/a2a"
         print(f"Sending task to {self.url}")
+        return SendTaskResponse(**await self.send_task_raw(payload))
+
+    async def send_task_raw(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Like send_task, but returns the JSON-RPC response as a dict without validating it."""
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**await self._send_request(request))
+        return await self._send_request(request)
 
     async def send_task_streaming(
         self, payload: dict[str, Any]
@@ -54,18 +67,25 @@ class A2AClient:
                     raise A2AClientHTTPError(400, str(e)) from e
 
     async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
+        if self.httpx_client is not None:
+            return await self._post(self.httpx_client, request)
         async with httpx.AsyncClient() as client:
-            try:
-                # Image generation could take time, adding timeout
-                response = await client.post(
-                    self.url, json=request.model_dump(), timeout=30
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
+            return await self._post(client, request)
+
+    async def _post(
+        self, client: httpx.AsyncClient, request: JSONRPCRequest
+    ) -> dict[str, Any]:
+        try:
+            # Image generation could take time, adding timeout
+            response = await client.post(
+                self.url, json=request.model_dump(), timeout=30
+            )
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
 
     async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
         request = GetTaskRequest(params=payload)
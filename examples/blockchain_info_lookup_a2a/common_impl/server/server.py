@@ -19,7 +19,8 @@ from common_impl.types import (
 )
 from pydantic import ValidationError
 import json
-from typing import AsyncIterable, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterable, AsyncIterator, Any
 from common_impl.server.task_manager import TaskManager
 
 import logging
@@ -41,13 +42,21 @@ class A2AServer:
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
-        self.app = Starlette()
+        self.app = Starlette(lifespan=self._lifespan)
         self.app.add_route(self.endpoint, self._process_request, methods=["POST"])
         self.app.add_route(
             "/.well-known/agent.json", self._get_agent_card, methods=["GET"]
         )
 
-    def start(self):
+    @asynccontextmanager
+    async def _lifespan(self, app: Starlette) -> AsyncIterator[None]:
+        await self.task_manager.startup()
+        try:
+            yield
+        finally:
+            await self.task_manager.shutdown()
+
+    def start(self, loop: str = "auto"):
         if self.agent_card is None:
             raise ValueError("agent_card is not defined")
 
@@ -56,7 +65,14 @@ class A2AServer:
 
         import uvicorn
 
-        uvicorn.run(self.app, host=self.host, port=self.port)
+        uvicorn.run(
+            self.app,
+            host=self.host,
+            port=self.port,
+            loop=loop,
+            http="httptools",
+            lifespan="on",
+        )
 
     def _get_agent_card(self, request: Request) -> JSONResponse:
         return JSONResponse(self.agent_card.model_dump(exclude_none=True))
@@ -110,7 +126,10 @@ class A2AServer:
 
             async def event_generator(result) -> AsyncIterable[dict[str, str]]:
                 async for item in result:
-                    yield {"data": item.model_dump_json(exclude_none=True)}
+                    # Serialized once; the debug log reuses the same string.
+                    data = item.model_dump_json(exclude_none=True)
+                    logger.debug("Streaming A2A event: %s", data)
+                    yield {"data": data}
 
             return EventSourceResponse(event_generator(result))
         elif isinstance(result, JSONRPCResponse):
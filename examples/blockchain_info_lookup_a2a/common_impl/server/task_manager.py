@@ -38,6 +38,12 @@ import logging
 logger = logging.getLogger(__name__)
 
 class TaskManager(ABC):
+    async def startup(self) -> None:
+        """Called once when the server starts; acquire shared resources here."""
+
+    async def shutdown(self) -> None:
+        """Called once when the server stops; release shared resources here."""
+
     @abstractmethod
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         pass
@@ -84,7 +90,7 @@ class InMemoryTaskManager(TaskManager):
         self.subscriber_lock = asyncio.Lock()
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
-        logger.info(f"Getting task {request.params.id}")
+        logger.info("Getting task %s", request.params.id)
         task_query_params: TaskQueryParams = request.params
 
         async with self.lock:
@@ -99,7 +105,7 @@ class InMemoryTaskManager(TaskManager):
         return GetTaskResponse(id=request.id, result=task_result)
 
     async def on_cancel_task(self, request: CancelTaskRequest) -> CancelTaskResponse:
-        logger.info(f"Cancelling task {request.params.id}")
+        logger.info("Cancelling task %s", request.params.id)
         task_id_params: TaskIdParams = request.params
 
         async with self.lock:
@@ -147,7 +153,7 @@ class InMemoryTaskManager(TaskManager):
     async def on_set_task_push_notification(
         self, request: SetTaskPushNotificationRequest
     ) -> SetTaskPushNotificationResponse:
-        logger.info(f"Setting task push notification {request.params.id}")
+        logger.info("Setting task push notification %s", request.params.id)
         task_notification_params: TaskPushNotificationConfig = request.params
 
         try:
@@ -166,7 +172,7 @@ class InMemoryTaskManager(TaskManager):
     async def on_get_task_push_notification(
         self, request: GetTaskPushNotificationRequest
     ) -> GetTaskPushNotificationResponse:
-        logger.info(f"Getting task push notification {request.params.id}")
+        logger.info("Getting task push notification %s", request.params.id)
         task_params: TaskIdParams = request.params
 
         try:
@@ -183,7 +189,7 @@ class InMemoryTaskManager(TaskManager):
         return GetTaskPushNotificationResponse(id=request.id, result=TaskPushNotificationConfig(id=task_params.id, pushNotificationConfig=notification_info))
 
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
-        logger.info(f"Upserting task {task_send_params.id}")
+        logger.info("Upserting task %s", task_send_params.id)
         async with self.lock:
             task = self.tasks.get(task_send_params.id)
             if task is None:
@@ -212,7 +218,7 @@ class InMemoryTaskManager(TaskManager):
             try:
                 task = self.tasks[task_id]
             except KeyError:
-                logger.error(f"Task {task_id} not found for updating the task")
+                logger.error("Task %s not found for updating the task", task_id)
                 raise ValueError(f"Task {task_id} not found")
 
             task.status = status
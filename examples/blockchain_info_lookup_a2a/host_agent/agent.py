@@ -1,12 +1,11 @@
 import logging
 import os
 import asyncio
+from contextlib import suppress
 
 from google.adk.agents import Agent
-from google.adk.agents.callback_context import CallbackContext
-from google.adk.tools import ToolContext
 
-from typing import Dict, Any, List, Optional
+from typing import Optional, Tuple
 
 from dotenv import load_dotenv
 
@@ -14,47 +13,83 @@ dotenv_path = os.path.join(os.path.dirname(__file__), '..', '.env')
 load_dotenv(dotenv_path=dotenv_path, override=True)
 
 try:
-    from .tools import delegate_tool, DISCOVERED_SPECIALIST_AGENTS, initialize_specialist_agents_discovery
+    from .tools import (
+        delegate_tool, specialist_details_tool, DISCOVERED_SPECIALIST_DESCRIPTIONS,
+        initialize_specialist_agents_discovery, load_cached_specialist_cards, close_specialist_clients,
+    )
 except ImportError as e:
     logging.critical(f"Failed to import tools for HostAgent: {e}")
     delegate_tool = None
-    DISCOVERED_SPECIALIST_AGENTS = {}
+    specialist_details_tool = None
+    DISCOVERED_SPECIALIST_DESCRIPTIONS = {}
     initialize_specialist_agents_discovery = None
+    load_cached_specialist_cards = None
+    close_specialist_clients = None
 
 logger = logging.getLogger(__name__)
 MODEL_ID_LIVE = os.getenv("LIVE_SERVER_MODEL", "gemini-2.0-flash-live-001")
 
+BASE_HOST_INSTRUCTION = (
+    "You are a friendly assistant interacting via voice and text. "
+    "Your primary function is to help users with queries about Bitcoin. "
+    "You have access to a specialist agent for this. "
+    "Based on the user's request, determine if the specialist agent is suitable. "
+    "If so, use the 'delegate_task_to_specialist' tool. Provide the specialist's name and the user's full query.\n"
+    "If the user asks for the price of Bitcoin (e.g., 'what's the price of BTC?'), delegate to the specialist. "
+    "If the user asks for the balance of a Bitcoin address (e.g., 'check the balance of 1A1zP...'), delegate to the specialist, providing the full query. "
+    "After the specialist responds:\n"
+    "  - If successful, relay the information clearly (e.g., 'The price of Bitcoin is $65,123 USD.' or 'That address has a balance of 5.2 BTC.').\n"
+    "  - If there's an error, inform the user politely (e.g., 'Sorry, I couldn't retrieve that information right now.').\n"
+    "Handle other conversational turns naturally.\n"
+    "The list below only summarizes each specialist; if you need its full description or skills "
+    "to decide whether it fits, call the 'get_specialist_details' tool with its name.\n\n"
+    "Available Specialist Agents:\n"
+)
+
+# Memoized instruction, keyed by the (name, description) pairs it was built from,
+# so it is only rebuilt when discovery yields a different specialist set.
+_HOST_INSTRUCTION: Optional[Tuple[Tuple[Tuple[str, str], ...], str]] = None
+
 def get_host_agent_instruction() -> str:
-    base_instruction = (
-        "You are a friendly assistant interacting via voice and text. "
-        "Your primary function is to help users with queries about Bitcoin. "
-        "You have access to a specialist agent for this. "
-        "Based on the user's request, determine if the specialist agent is suitable. "
-        "If so, use the 'delegate_task_to_specialist' tool. Provide the specialist's name and the user's full query.\n"
-        "If the user asks for the price of Bitcoin (e.g., 'what's the price of BTC?'), delegate to the specialist. "
-        "If the user asks for the balance of a Bitcoin address (e.g., 'check the balance of 1A1zP...'), delegate to the specialist, providing the full query. "
-        "After the specialist responds:\n"
-        "  - If successful, relay the information clearly (e.g., 'The price of Bitcoin is $65,123 USD.' or 'That address has a balance of 5.2 BTC.').\n"
-        "  - If there's an error, inform the user politely (e.g., 'Sorry, I couldn't retrieve that information right now.').\n"
-        "Handle other conversational turns naturally.\n\n"
-        "Available Specialist Agents:\n"
-    )
-    if not DISCOVERED_SPECIALIST_AGENTS:
-        base_instruction += "- None discovered. You must handle all queries yourself if possible, or state you cannot fulfill the request.\n"
+    global _HOST_INSTRUCTION
+    specialists = tuple(DISCOVERED_SPECIALIST_DESCRIPTIONS.items())
+    if _HOST_INSTRUCTION is not None and _HOST_INSTRUCTION[0] == specialists:
+        return _HOST_INSTRUCTION[1]
+
+    lines = [BASE_HOST_INSTRUCTION]
+    if not specialists:
+        lines.append("- None discovered. You must handle all queries yourself if possible, or state you cannot fulfill the request.\n")
     else:
-        for name, card in DISCOVERED_SPECIALIST_AGENTS.items():
-            description = card.description or "No description provided."
-            base_instruction += f"- Name: '{name}', Description: '{description}'\n"
-    
-    logger.debug(f"Generated HostAgent Instruction:\n{base_instruction}")
-    return base_instruction
+        lines.extend(f"- Name: '{name}', Description: '{description}'\n" for name, description in specialists)
+    instruction = "".join(lines)
+    _HOST_INSTRUCTION = (specialists, instruction)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Generated HostAgent Instruction:\n%s", instruction)
+    return instruction
 
 host_agent: Optional[Agent] = None
+# Background re-discovery started when specialists were served from the on-disk snapshot
+_discovery_refresh_task: Optional[asyncio.Task] = None
+
+async def _refresh_specialists():
+    """Re-runs discovery and points the HostAgent at the refreshed specialist list."""
+    try:
+        await initialize_specialist_agents_discovery()
+    except Exception as e:
+        logger.error(f"Background specialist discovery failed: {e}", exc_info=True)
+        return
+    if host_agent is not None:
+        # Only sessions started after this pick up the new prompt.
+        host_agent.instruction = get_host_agent_instruction()
 
 async def create_host_agent() -> Optional[Agent]:
     """Asynchronously initializes specialists and creates the HostAgent."""
-    global host_agent
-    if initialize_specialist_agents_discovery:
+    global host_agent, _discovery_refresh_task
+    if load_cached_specialist_cards and load_cached_specialist_cards():
+        # Serve the last known specialists now; the network refresh runs in the background.
+        _discovery_refresh_task = asyncio.create_task(_refresh_specialists())
+    elif initialize_specialist_agents_discovery:
         await initialize_specialist_agents_discovery()
     else:
         logger.error("initialize_specialist_agents_discovery function not available.")
@@ -70,7 +105,16 @@ async def create_host_agent() -> Optional[Agent]:
         model=MODEL_ID_LIVE,
         description="User-facing agent that delegates to a Bitcoin specialist.",
         instruction=current_instruction,
-        tools=[delegate_tool],
+        tools=[tool for tool in (delegate_tool, specialist_details_tool) if tool],
     )
     logger.info(f"ADK Host Agent '{host_agent.name}' created with model '{MODEL_ID_LIVE}'.")
-    return host_agent
\ No newline at end of file
+    return host_agent
+
+async def shutdown_host_agent():
+    """Stops any background discovery and releases the HostAgent's pooled A2A connections."""
+    if _discovery_refresh_task is not None and not _discovery_refresh_task.done():
+        _discovery_refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _discovery_refresh_task
+    if close_specialist_clients:
+        await close_specialist_clients()
@@ -1,9 +1,14 @@
 import os
+import time
+import hashlib
 import uuid
+import asyncio
 import logging
-import json
-from typing import Dict, Any, List, Optional # Added List, Optional
+import orjson
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple # Added List, Optional
 import httpx # For fetching agent card
+from pydantic import ValidationError
 
 # ADK Imports
 from google.adk.tools import ToolContext, FunctionTool
@@ -28,52 +33,187 @@ SPECIALIST_AGENT_BASE_URLS = [url.strip() for url in SPECIALIST_AGENT_BASE_URLS_
 
 # Cache for discovered agent cards, keyed by agent name (or another unique ID from the card)
 DISCOVERED_SPECIALIST_AGENTS: Dict[str, AgentCard] = {}
+# One A2A client per discovered specialist, all sharing the pooled HTTP client below
+DISCOVERED_SPECIALIST_CLIENTS: Dict[str, A2AClient] = {}
+# One-line summary of each discovered specialist for the HostAgent prompt, resolved once at
+# discovery; the full card is only sent to the model on request via get_specialist_details.
+DISCOVERED_SPECIALIST_DESCRIPTIONS: Dict[str, str] = {}
+SPECIALIST_SUMMARY_MAX_CHARS = 80
+
+# Last successful discovery, persisted so the next start can serve cards from disk
+# immediately and refresh them in the background. The default file is keyed by the
+# configured base URLs, so checkouts with different specialists never share one.
+_SPECIALIST_URLS_KEY = hashlib.blake2b(
+    "\n".join(SPECIALIST_AGENT_BASE_URLS).encode(), digest_size=8
+).hexdigest()
+SPECIALIST_CARD_CACHE_PATH = Path(os.getenv(
+    "SPECIALIST_CARD_CACHE_PATH",
+    str(Path.home() / ".cache" / "host_agent" / f"specialists-{_SPECIALIST_URLS_KEY}.json"),
+)).expanduser()
+SPECIALIST_CARD_CACHE_MAX_AGE_SECONDS = float(os.getenv("SPECIALIST_CARD_CACHE_MAX_AGE_SECONDS", str(6 * 3600)))
+
+# Shared HTTP client for agent-card discovery and A2A delegation, so repeated
+# delegations reuse keep-alive connections instead of reconnecting every call.
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Delegations currently running, keyed by (specialist name, query payload)
+_INFLIGHT_DELEGATIONS: Dict[Tuple[str, str], asyncio.Future] = {}
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            # HTTP/2 is only negotiated over TLS (ALPN); plain-http specialists stay on HTTP/1.1.
+            http2=any(url.startswith("https://") for url in SPECIALIST_AGENT_BASE_URLS),
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+    return _http_client
+
+async def close_specialist_clients():
+    """Closes the shared HTTP client used for A2A calls. Call on server shutdown."""
+    global _http_client
+    DISCOVERED_SPECIALIST_CLIENTS.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+async def _fetch_agent_card(client: httpx.AsyncClient, base_url: str) -> Optional[AgentCard]:
+    """Fetches and validates one specialist's Agent Card; returns None on failure."""
+    card_url = f"{base_url.rstrip('/')}/.well-known/agent.json"
+    try:
+        logger.info(f"Fetching Agent Card from: {card_url}")
+        # In a real A2A client, you'd use A2ACardResolver,
+        # but for simplicity in this tool, direct httpx get.
+        # resolver = A2ACardResolver(base_url=base_url) # This is synchronous, needs async wrapper or use httpx
+
+        response = await client.get(card_url, timeout=10.0)
+        response.raise_for_status()
+        # Validate straight from the raw bytes; no intermediate dict.
+        agent_card = AgentCard.model_validate_json(response.content)
+
+        if not agent_card.name:
+            logger.error(f"Agent Card from {card_url} is missing a name. Skipping.")
+            return None
+        if not agent_card.url: # This is the A2A endpoint URL
+            logger.error(f"Agent Card for '{agent_card.name}' from {card_url} is missing the A2A 'url'. Skipping.")
+            return None
+        return agent_card
+
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Failed to fetch Agent Card from {card_url}: HTTP {e.response.status_code}")
+    except (httpx.RequestError, ValidationError, ValueError) as e:
+        logger.error(f"Error processing Agent Card from {card_url}: {e}", exc_info=True)
+    return None
+
+def _summarize_description(description: Optional[str]) -> str:
+    """Returns the first line of a card description, cut to SPECIALIST_SUMMARY_MAX_CHARS."""
+    summary = (description or "").strip().split("\n", 1)[0]
+    if not summary:
+        return "No description provided."
+    if len(summary) > SPECIALIST_SUMMARY_MAX_CHARS:
+        summary = summary[:SPECIALIST_SUMMARY_MAX_CHARS - 3].rstrip() + "..."
+    return summary
+
+
+def _register_specialist(agent_card: AgentCard, client: httpx.AsyncClient):
+    DISCOVERED_SPECIALIST_AGENTS[agent_card.name] = agent_card
+    DISCOVERED_SPECIALIST_CLIENTS[agent_card.name] = A2AClient(agent_card=agent_card, httpx_client=client)
+    DISCOVERED_SPECIALIST_DESCRIPTIONS[agent_card.name] = _summarize_description(agent_card.description)
+
+
+def load_cached_specialist_cards() -> bool:
+    """
+    Populates the cache from the last discovery snapshot on disk, if one exists and is fresh.
+    Returns True when at least one specialist was loaded.
+    """
+    try:
+        if time.time() - SPECIALIST_CARD_CACHE_PATH.stat().st_mtime > SPECIALIST_CARD_CACHE_MAX_AGE_SECONDS:
+            logger.info("Specialist card snapshot at %s is stale; discovering from scratch.", SPECIALIST_CARD_CACHE_PATH)
+            return False
+        snapshot = orjson.loads(SPECIALIST_CARD_CACHE_PATH.read_bytes())
+        if not isinstance(snapshot, dict) or snapshot.get("base_urls") != SPECIALIST_AGENT_BASE_URLS:
+            logger.info("Specialist card snapshot at %s was built from other base URLs; discovering from scratch.", SPECIALIST_CARD_CACHE_PATH)
+            return False
+        agent_cards = [AgentCard.model_validate(card) for card in snapshot.get("cards", [])]
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, ValidationError) as e:
+        logger.warning("Ignoring unreadable specialist card snapshot at %s: %s", SPECIALIST_CARD_CACHE_PATH, e)
+        return False
+
+    client = _get_http_client()
+    for agent_card in agent_cards:
+        _register_specialist(agent_card, client)
+    logger.info("Loaded %d specialist agent card(s) from %s", len(agent_cards), SPECIALIST_CARD_CACHE_PATH)
+    return bool(agent_cards)
+
+
+def _save_specialist_cards(agent_cards: List[AgentCard]):
+    try:
+        SPECIALIST_CARD_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # The base URLs are stored with the cards so a snapshot is only reused for the same configuration.
+        SPECIALIST_CARD_CACHE_PATH.write_bytes(orjson.dumps({
+            "base_urls": SPECIALIST_AGENT_BASE_URLS,
+            "cards": [agent_card.model_dump(mode="json", exclude_none=True) for agent_card in agent_cards],
+        }))
+    except OSError as e:
+        logger.warning("Could not save specialist card snapshot to %s: %s", SPECIALIST_CARD_CACHE_PATH, e)
+
 
 async def initialize_specialist_agents_discovery():
     """
     Fetches Agent Cards from configured specialist base URLs and populates the cache.
-    This should be called once at HostAgent startup.
+    This is called at HostAgent startup, in the background when a snapshot was loaded.
+    If no specialist answers, previously loaded cards are kept.
     """
     if not SPECIALIST_AGENT_BASE_URLS:
         logger.warning("No specialist agent base URLs configured. HostAgent cannot delegate via A2A.")
         return
 
     logger.info(f"Discovering specialist agents from base URLs: {SPECIALIST_AGENT_BASE_URLS}")
-    async with httpx.AsyncClient() as client:
-        for base_url in SPECIALIST_AGENT_BASE_URLS:
-            card_url = f"{base_url.rstrip('/')}/.well-known/agent.json"
-            try:
-                logger.info(f"Fetching Agent Card from: {card_url}")
-                # In a real A2A client, you'd use A2ACardResolver,
-                # but for simplicity in this tool, direct httpx get.
-                # resolver = A2ACardResolver(base_url=base_url) # This is synchronous, needs async wrapper or use httpx
-                
-                response = await client.get(card_url, timeout=10.0)
-                response.raise_for_status()
-                card_data = response.json()
-                agent_card = AgentCard(**card_data)
-
-                if not agent_card.name:
-                    logger.error(f"Agent Card from {card_url} is missing a name. Skipping.")
-                    continue
-                if not agent_card.url: # This is the A2A endpoint URL
-                    logger.error(f"Agent Card for '{agent_card.name}' from {card_url} is missing the A2A 'url'. Skipping.")
-                    continue
-
-                DISCOVERED_SPECIALIST_AGENTS[agent_card.name] = agent_card
-                logger.info(f"Discovered Specialist Agent: '{agent_card.name}' - A2A URL: {agent_card.url}")
-                logger.debug(f"  Description: {agent_card.description}")
-                logger.debug(f"  Skills: {[s.name for s in agent_card.skills]}")
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Failed to fetch Agent Card from {card_url}: HTTP {e.response.status_code}")
-            except (httpx.RequestError, json.JSONDecodeError, ValueError) as e: # ValueError for Pydantic validation
-                logger.error(f"Error processing Agent Card from {card_url}: {e}", exc_info=True)
-    
-    if not DISCOVERED_SPECIALIST_AGENTS:
+    client = _get_http_client()
+    # Cards are independent, so fetch them concurrently: startup waits for the
+    # slowest specialist rather than the sum of all of them.
+    agent_cards = [
+        agent_card
+        for agent_card in await asyncio.gather(
+            *(_fetch_agent_card(client, base_url) for base_url in SPECIALIST_AGENT_BASE_URLS)
+        )
+        if agent_card is not None
+    ]
+    if agent_cards:
+        # Replace rather than merge, so specialists that went away are dropped.
+        DISCOVERED_SPECIALIST_AGENTS.clear()
+        DISCOVERED_SPECIALIST_CLIENTS.clear()
+        DISCOVERED_SPECIALIST_DESCRIPTIONS.clear()
+    for agent_card in agent_cards:
+        _register_specialist(agent_card, client)
+        logger.info(f"Discovered Specialist Agent: '{agent_card.name}' - A2A URL: {agent_card.url}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("  Description: %s", agent_card.description)
+            logger.debug("  Skills: %s", [s.name for s in agent_card.skills])
+
+    if agent_cards:
+        _save_specialist_cards(agent_cards)
+    elif not DISCOVERED_SPECIALIST_AGENTS:
         logger.warning("No specialist agents were successfully discovered.")
 
 
+def _first_data(artifacts: List[Dict[str, Any]], artifact_name: Optional[str] = None, required_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Returns the data of the first data part across raw artifacts, optionally filtered by artifact name and data key."""
+    return next(
+        (
+            part["data"]
+            for artifact in artifacts
+            if artifact_name is None or artifact.get("name") == artifact_name
+            for part in (artifact.get("parts") or ())
+            if part.get("type") == "data" and (required_key is None or required_key in part["data"])
+        ),
+        None,
+    )
+
+
 async def delegate_task_to_specialist(
     specialist_agent_name: str,
     query_payload: str, # Could be a JSON string for more complex inputs
@@ -90,34 +230,54 @@ async def delegate_task_to_specialist(
     Returns:
         A dictionary containing the specialist's processed result or an error.
     """
-    logger.info(f"ADK Tool: 'delegate_task_to_specialist' for '{specialist_agent_name}' with query: '{query_payload[:100]}...'")
+    logger.info("ADK Tool: 'delegate_task_to_specialist' for '%s' with query: '%.100s...'", specialist_agent_name, query_payload)
 
-    if specialist_agent_name not in DISCOVERED_SPECIALIST_AGENTS:
+    # Discovery pre-builds one client per specialist; it carries the A2A endpoint
+    # URL, so the full AgentCard is not needed on this path.
+    a2a_client = DISCOVERED_SPECIALIST_CLIENTS.get(specialist_agent_name)
+    if a2a_client is None:
         err_msg = f"Specialist agent '{specialist_agent_name}' not found or not discovered."
         logger.error(f"ADK Tool: {err_msg}")
         return {"status": "error", "message": err_msg}
 
-    agent_card = DISCOVERED_SPECIALIST_AGENTS[specialist_agent_name]
-    specialist_a2a_url = agent_card.url # Get A2A endpoint from the card
+    # Identical delegations issued while one is still running (e.g. the model
+    # repeating a function call within a turn) share a single A2A task. Finished
+    # results are never reused; each later delegation is a new task.
+    delegation_key = (specialist_agent_name, query_payload)
+    delegation = _INFLIGHT_DELEGATIONS.get(delegation_key)
+    if delegation is None:
+        delegation = asyncio.ensure_future(_send_to_specialist(
+            a2a_client, specialist_agent_name, tool_context._invocation_context.session.id, query_payload
+        ))
+        _INFLIGHT_DELEGATIONS[delegation_key] = delegation
+        delegation.add_done_callback(lambda _: _INFLIGHT_DELEGATIONS.pop(delegation_key, None))
+    else:
+        logger.info("ADK Tool: Joining in-flight delegation to '%s'.", specialist_agent_name)
+    # Shielded so one cancelled caller does not cancel the A2A call for the others.
+    return await asyncio.shield(delegation)
+
 
-    a2a_session_id = tool_context._invocation_context.session.id
+async def _send_to_specialist(
+    a2a_client: A2AClient, specialist_agent_name: str, a2a_session_id: str, query_payload: str
+) -> Dict[str, Any]:
+    """Sends one A2A task to a specialist and maps the response to the tool's result dict."""
+    specialist_a2a_url = a2a_client.url
     a2a_task_id = uuid.uuid4().hex
 
     # For simplicity, assume query_payload is text for now.
     # For more complex interactions, query_payload could be a JSON string
     # that gets parsed into multiple A2A MessageParts.
-    try:
-        # Attempt to parse if it's JSON, otherwise treat as text
-        parts_data = json.loads(query_payload)
-        if isinstance(parts_data, dict): # Expecting a dict for DataPart
-            a2a_parts = [DataPart(data=parts_data)]
-        else: # Fallback to text if not a dict
-            a2a_parts = [TextPart(text=str(query_payload))]
-    except json.JSONDecodeError:
-        a2a_parts = [TextPart(text=query_payload)]
+    # Only a JSON object can become a DataPart, so plain-text queries (the usual
+    # voice case) skip the parse attempt entirely.
+    a2a_parts = [TextPart(text=query_payload)]
+    if query_payload.lstrip().startswith("{"):
+        try:
+            parts_data = orjson.loads(query_payload)
+            if isinstance(parts_data, dict): # Expecting a dict for DataPart
+                a2a_parts = [DataPart(data=parts_data)]
+        except orjson.JSONDecodeError:
+            pass
 
-
-    a2a_client = A2AClient(url=specialist_a2a_url) # Use URL from card
     task_params = TaskSendParams(
         id=a2a_task_id,
         sessionId=a2a_session_id,
@@ -127,48 +287,49 @@ async def delegate_task_to_specialist(
         )
     )
 
-    logger.info(f"ADK Tool: Sending A2A task to '{specialist_agent_name}' at {specialist_a2a_url}...")
-    logger.debug(f"ADK Tool: A2A TaskSendParams: {task_params.model_dump_json(indent=2)}")
+    logger.info("ADK Tool: Sending A2A task to '%s' at %s...", specialist_agent_name, specialist_a2a_url)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("ADK Tool: A2A TaskSendParams: %s", task_params.model_dump_json())
 
     try:
-        a2a_response = await a2a_client.send_task(task_params.model_dump())
+        # The response is read as a plain dict; validating it into pydantic models
+        # would only be thrown away once the data part has been picked out.
+        a2a_response = await a2a_client.send_task_raw(task_params.model_dump())
 
-        if a2a_response.error:
-            error_msg = f"A2A protocol error from '{specialist_agent_name}': {a2a_response.error.message} (Code: {a2a_response.error.code})"
+        a2a_error = a2a_response.get("error")
+        if a2a_error:
+            error_msg = f"A2A protocol error from '{specialist_agent_name}': {a2a_error.get('message')} (Code: {a2a_error.get('code')})"
             logger.error(f"ADK Tool: {error_msg}")
             return {"status": "error", "message": error_msg, "specialist_name": specialist_agent_name}
 
-        if a2a_response.result:
-            task_result = a2a_response.result
-            logger.debug(f"ADK Tool: A2A Task Result from '{specialist_agent_name}', State: {task_result.status.state}")
+        task_result = a2a_response.get("result")
+        if task_result:
+            state = task_result["status"]["state"]
+            artifacts = task_result.get("artifacts")
+            logger.debug("ADK Tool: A2A Task Result from '%s', State: %s", specialist_agent_name, state)
 
-            if task_result.status.state == TaskState.COMPLETED and task_result.artifacts:
+            if state == TaskState.COMPLETED and artifacts:
                 # Generic artifact extraction - you might want to make this more specific
                 # if different specialists return different artifact structures.
                 # For now, just return the first DataPart found.
-                for artifact in task_result.artifacts:
-                     if artifact.parts:
-                         for part in artifact.parts:
-                             if isinstance(part, DataPart):
-                                 data = part.data
-                                 logger.info(f"ADK Tool: Successfully retrieved data from '{specialist_agent_name}': {data}")
-                                 return {"status": "success", "data": data, "specialist_name": specialist_agent_name}
+                data = _first_data(artifacts)
+                if data is not None:
+                    logger.info("ADK Tool: Successfully retrieved data from '%s': %s", specialist_agent_name, data)
+                    return {"status": "success", "data": data, "specialist_name": specialist_agent_name}
                 logger.warning(f"ADK Tool: Task from '{specialist_agent_name}' completed but no suitable DataPart artifact found.")
                 return {"status": "error", "message": "Received no parsable data artifact from specialist.", "specialist_name": specialist_agent_name}
 
-            elif task_result.status.state == TaskState.FAILED and task_result.artifacts:
-                 for artifact in task_result.artifacts:
-                     if artifact.name == "error_details" and artifact.parts:
-                          for part in artifact.parts:
-                              if isinstance(part, DataPart) and "error" in part.data:
-                                  error_msg = part.data["error"]
-                                  logger.error(f"ADK Tool: Specialist '{specialist_agent_name}' task failed: {error_msg}")
-                                  return {"status": "error", "message": f"Specialist Error: {error_msg}", "specialist_name": specialist_agent_name}
+            elif state == TaskState.FAILED and artifacts:
+                 error_data = _first_data(artifacts, artifact_name="error_details", required_key="error")
+                 if error_data is not None:
+                     error_msg = error_data["error"]
+                     logger.error(f"ADK Tool: Specialist '{specialist_agent_name}' task failed: {error_msg}")
+                     return {"status": "error", "message": f"Specialist Error: {error_msg}", "specialist_name": specialist_agent_name}
                  logger.error(f"ADK Tool: Specialist '{specialist_agent_name}' task failed, but couldn't parse error artifact.")
                  return {"status": "error", "message": "Specialist reported failure with unclear details.", "specialist_name": specialist_agent_name}
             else:
-                 logger.error(f"ADK Tool: Specialist '{specialist_agent_name}' task ended in unexpected state: {task_result.status.state}")
-                 return {"status": "error", "message": f"Specialist agent '{specialist_agent_name}' ended in state: {task_result.status.state}", "specialist_name": specialist_agent_name}
+                 logger.error(f"ADK Tool: Specialist '{specialist_agent_name}' task ended in unexpected state: {state}")
+                 return {"status": "error", "message": f"Specialist agent '{specialist_agent_name}' ended in state: {state}", "specialist_name": specialist_agent_name}
         else:
             logger.error(f"ADK Tool: Received empty successful response from A2A server '{specialist_agent_name}'.")
             return {"status": "error", "message": "Empty response from specialist agent.", "specialist_name": specialist_agent_name}
@@ -181,10 +342,35 @@ async def delegate_task_to_specialist(
         return {"status": "error", "message": f"An unexpected error occurred with '{specialist_agent_name}': {str(e)}", "specialist_name": specialist_agent_name}
 
 
-# Create the ADK FunctionTool
+async def get_specialist_details(specialist_agent_name: str) -> Dict[str, Any]:
+    """
+    Returns the full description and skills of a discovered specialist agent.
+
+    Args:
+        specialist_agent_name: The name of the specialist agent (must match a discovered AgentCard.name).
+
+    Returns:
+        A dictionary with the specialist's description and skills, or an error.
+    """
+    agent_card = DISCOVERED_SPECIALIST_AGENTS.get(specialist_agent_name)
+    if agent_card is None:
+        return {"status": "error", "message": f"Specialist agent '{specialist_agent_name}' not found or not discovered."}
+    return {
+        "status": "success",
+        "name": agent_card.name,
+        "description": agent_card.description,
+        "skills": [
+            {"name": skill.name, "description": skill.description, "examples": skill.examples}
+            for skill in agent_card.skills
+        ],
+    }
+
+
+# Create the ADK FunctionTools
 delegate_tool = FunctionTool(
     func=delegate_task_to_specialist,
     # Name for the LLM to call
 )
+specialist_details_tool = FunctionTool(func=get_specialist_details)
 
 logger.info("✅ ADK Tool for dynamic A2A delegation defined.")
\ No newline at end of file
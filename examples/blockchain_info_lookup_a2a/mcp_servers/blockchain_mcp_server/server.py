@@ -1,9 +1,12 @@
 import logging
 import asyncio
 import httpx
+import orjson
 import sys
-import json
+import time
 import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from dotenv import load_dotenv
 
 # Determine the absolute path to the .env file in the project root
@@ -11,15 +14,52 @@ project_root_env = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",
 load_dotenv(project_root_env, override=True)
 
 # --- Configuration ---
-logging.basicConfig(level=logging.DEBUG,
+# Logs must go to stderr: stdout is reserved for the MCP JSON-RPC stream.
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(),
                     stream=sys.stderr,
                     format='%(asctime)s - %(name)s - %(levelname)s - MCP_SERVER - %(message)s')
 logger = logging.getLogger(__name__)
 
+# --- Shared HTTP Client ---
+# One pooled HTTP/2 client for the server's lifetime, so repeated tool calls reuse
+# the TLS connections to the blockchain APIs instead of handshaking every time.
+http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=5.0,
+    limits=httpx.Limits(max_keepalive_connections=10),
+)
+
+SATOSHIS_PER_BTC = 100_000_000
+
+# --- Price Cache ---
+# Ticker prices barely move within a few seconds; bursts of price queries are
+# collapsed into one upstream call. Errors are never cached.
+PRICE_CACHE_TTL_SECONDS = 5.0
+_price_cache = {"fetched_at": 0.0, "value": None}
+_price_lock = asyncio.Lock()
+
+# --- Balance Cache ---
+# Per-address results are kept briefly, and concurrent queries for the same
+# address share one in-flight upstream fetch. Errors are never cached.
+BALANCE_CACHE_TTL_SECONDS = 10.0
+BALANCE_CACHE_MAX_ENTRIES = 1024
+_balance_cache = {} # address -> (fetched_at, result)
+_balance_fetches = {} # address -> in-flight fetch task
+
 # --- FastMCP Server Initialization ---
 from mcp.server.fastmcp import FastMCP
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Closes the shared HTTP client when the MCP server shuts down."""
+    try:
+        yield
+    finally:
+        await http_client.aclose()
+        logger.debug("Shared HTTP client closed.")
+
 logger.info("Initializing FastMCP server...")
-mcp = FastMCP("Blockchain Info Server")
+mcp = FastMCP("Blockchain Info Server", lifespan=server_lifespan)
 
 # --- Tool Functions ---
 
@@ -29,18 +69,26 @@ async def get_bitcoin_price() -> dict:
     Retrieves the current Bitcoin price in major currencies.
     """
     logger.debug("Tool 'get_bitcoin_price' called.")
+    if _price_cache["value"] is not None and time.monotonic() - _price_cache["fetched_at"] < PRICE_CACHE_TTL_SECONDS:
+        logger.debug("Returning cached Bitcoin price.")
+        return _price_cache["value"]
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get("https://api.blockchain.com/ticker")
+        async with _price_lock:
+            # Another caller may have refreshed the cache while we waited for the lock.
+            if _price_cache["value"] is not None and time.monotonic() - _price_cache["fetched_at"] < PRICE_CACHE_TTL_SECONDS:
+                return _price_cache["value"]
+            response = await http_client.get("https://api.blockchain.com/ticker")
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             # For simplicity, we'll return a few major currencies
             result = {
                 "USD": data.get("USD", {}).get("last"),
                 "EUR": data.get("EUR", {}).get("last"),
                 "GBP": data.get("GBP", {}).get("last"),
             }
-            logger.info(f"Successfully retrieved Bitcoin price: {result}")
+            _price_cache["fetched_at"] = time.monotonic()
+            _price_cache["value"] = result
+            logger.info("Successfully retrieved Bitcoin price: %s", result)
             return result
     except Exception as e:
         logger.error(f"Error fetching Bitcoin price: {e}", exc_info=True)
@@ -51,24 +99,43 @@ async def get_address_balance(address: str) -> dict:
     """
     Retrieves the balance for a given Bitcoin address.
     """
-    logger.debug(f"Tool 'get_address_balance' called with address: {address}")
+    logger.debug("Tool 'get_address_balance' called with address: %s", address)
+    cached = _balance_cache.get(address)
+    if cached is not None and time.monotonic() - cached[0] < BALANCE_CACHE_TTL_SECONDS:
+        logger.debug("Returning cached balance for %s.", address)
+        return cached[1]
+    fetch = _balance_fetches.get(address)
+    if fetch is None:
+        fetch = asyncio.ensure_future(_fetch_address_balance(address))
+        _balance_fetches[address] = fetch
+        fetch.add_done_callback(lambda _: _balance_fetches.pop(address, None))
+    # Shielded so one cancelled caller does not cancel the fetch for the others.
+    return await asyncio.shield(fetch)
+
+async def _fetch_address_balance(address: str) -> dict:
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"https://blockchain.info/rawaddr/{address}")
-            response.raise_for_status()
-            data = response.json()
-            # Extract relevant balance information
-            # Balance is in Satoshi, so convert to BTC
-            final_balance_satoshi = data.get("final_balance", 0)
-            final_balance_btc = final_balance_satoshi / 100_000_000
+        response = await http_client.get(f"https://blockchain.info/rawaddr/{address}")
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        # Extract relevant balance information
+        # Balance is in Satoshi, so convert to BTC
+        try:
             result = {
-                "address": data.get("address"),
-                "final_balance_btc": final_balance_btc,
-                "total_received_btc": data.get("total_received", 0) / 100_000_000,
-                "n_tx": data.get("n_tx"),
+                "address": data["address"],
+                "final_balance_btc": data["final_balance"] / SATOSHIS_PER_BTC,
+                "total_received_btc": data["total_received"] / SATOSHIS_PER_BTC,
+                "n_tx": data["n_tx"],
             }
-            logger.info(f"Successfully retrieved balance for {address}: {result}")
-            return result
+        except KeyError as e:
+            logger.error(f"Malformed balance response for {address}: missing {e}")
+            return {"error": "Malformed response from blockchain API."}
+        _balance_cache.pop(address, None)
+        if len(_balance_cache) >= BALANCE_CACHE_MAX_ENTRIES:
+            # Entries are kept in insertion order, so the first one is the oldest.
+            del _balance_cache[next(iter(_balance_cache))]
+        _balance_cache[address] = (time.monotonic(), result)
+        logger.info("Successfully retrieved balance for %s: %s", address, result)
+        return result
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 500:
              logger.error(f"Invalid Bitcoin address format or address not found for: {address}")
@@ -81,6 +148,14 @@ async def get_address_balance(address: str) -> dict:
 
 # --- Main Execution ---
 if __name__ == "__main__":
+    # Prefer uvloop for the event loop (not available on Windows); FastMCP's
+    # anyio runner picks it up through the installed event loop policy.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.warning("uvloop not available. Falling back to the default asyncio event loop.")
+
     logger.info("Starting FastMCP Blockchain Info Server...")
     mcp.run()
     logger.info("FastMCP Blockchain Info Server stopped.")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import logging
+from pathlib import Path
 import click
 from dotenv import load_dotenv
 
@@ -9,8 +10,9 @@ from common_impl.types import AgentCard, AgentCapabilities, AgentSkill
 from .task_manager import BlockchainInfoTaskManager
 
 # --- Configuration ---
-dotenv_path = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
-load_dotenv(dotenv_path=dotenv_path, override=True)
+AGENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = AGENT_DIR.parents[1]
+load_dotenv(dotenv_path=PROJECT_ROOT / '.env', override=True)
 
 logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(),
                     format='%(asctime)s - %(name)s - %(levelname)s - A2A_SERVER - %(message)s')
@@ -32,17 +34,18 @@ def main(host: str, port: int, mcp_server_path: str):
     logger.info(f"  Port: {port}")
     logger.info(f"  MCP Server Script Path: {mcp_server_path}")
 
-    if not os.path.isabs(mcp_server_path):
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        mcp_server_path = os.path.join(project_root, mcp_server_path)
-        logger.info(f"Resolved MCP server path to: {mcp_server_path}")
-    
-    if not os.path.exists(mcp_server_path):
-        logger.error(f"Error: MCP server script not found at: '{mcp_server_path}'")
+    mcp_server_script = Path(mcp_server_path)
+    if not mcp_server_script.is_absolute():
+        mcp_server_script = PROJECT_ROOT / mcp_server_script
+        logger.info(f"Resolved MCP server path to: {mcp_server_script}")
+
+    if not mcp_server_script.is_file():
+        logger.error(f"Error: MCP server script not found at: '{mcp_server_script}'")
         return
+    mcp_server_path = os.fspath(mcp_server_script)
 
     try:
-        capabilities = AgentCapabilities(streaming=False)
+        capabilities = AgentCapabilities(streaming=True)
         skills = [
             AgentSkill(
                 id="get_bitcoin_price_skill",
@@ -84,7 +87,15 @@ def main(host: str, port: int, mcp_server_path: str):
             port=port,
         )
         logger.info(f"A2A Server configured to listen on {host}:{port}")
-        server.start()
+
+        # Prefer uvloop for the event loop (not available on Windows).
+        try:
+            import uvloop # noqa: F401
+            event_loop_impl = "uvloop"
+        except ImportError:
+            logger.warning("uvloop not available. Falling back to the default asyncio event loop.")
+            event_loop_impl = "asyncio"
+        server.start(loop=event_loop_impl)
 
     except Exception as e:
         logger.critical(f"An unexpected error occurred during server startup: {e}", exc_info=True)
@@ -1,4 +1,3 @@
-import asyncio
 import os
 import sys
 import logging
@@ -6,12 +5,10 @@ from contextlib import AsyncExitStack
 
 # --- ADK Imports ---
 from google.adk.agents import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types as genai_types
 
 # --- MCP Client Imports ---
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
+from mcp.client.stdio import get_default_environment
 
 # --- Environment Loading ---
 from dotenv import load_dotenv
@@ -33,6 +30,13 @@ async def get_mcp_tools_async(mcp_server_script_path: str) -> tuple[list, AsyncE
         connection_params = StdioServerParameters(
             command=sys.executable,
             args=[mcp_server_script_path],
+            # stdout carries the JSON-RPC stream: keep it unbuffered, and pass the log
+            # level through so the server's (stderr) logging is not forced to DEBUG.
+            env={
+                **get_default_environment(),
+                "PYTHONUNBUFFERED": "1",
+                "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
+            },
         )
         tools, exit_stack = await MCPToolset.from_server(
             connection_params=connection_params
@@ -1,140 +1,396 @@
 import os
+import re
+import asyncio
+import functools
 import logging
-import json
-from typing import Union, AsyncIterable, Dict, Any
+from typing import Union, AsyncIterable, Dict, Any, List, Optional, Set, Tuple
 
-from google.adk.agents import Agent
+import anyio
+import orjson
+from pydantic import ValidationError
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types as genai_types
+from mcp.types import CallToolResult, TextContent
 
 from common_impl.server.task_manager import InMemoryTaskManager
 from common_impl.types import (
-    SendTaskRequest, SendTaskResponse, Task, TaskState, TaskStatus,
-    Artifact, TextPart, DataPart, JSONRPCError,
-    SendTaskStreamingRequest, SendTaskStreamingResponse, UnsupportedOperationError, JSONRPCResponse
+    SendTaskRequest, SendTaskResponse, Task, TaskSendParams, TaskState,
+    Artifact, TextPart, DataPart,
+    SendTaskStreamingRequest, SendTaskStreamingResponse, JSONRPCResponse,
+    TaskStatusUpdateEvent, TaskArtifactUpdateEvent,
 )
 
 from .agent import create_agent_with_mcp_tools
 
 logger = logging.getLogger(__name__)
 
+ADK_APP_NAME = "blockchain_info_agent"
+
+def make_error_artifact(error_msg: str) -> Artifact:
+    """Builds the 'error_details' artifact without re-validating its fixed, known-good shape."""
+    return Artifact.model_construct(
+        name="error_details",
+        parts=[DataPart.model_construct(data={"error": error_msg})],
+    )
+
+def make_result_artifact(result: Dict[str, Any]) -> Artifact:
+    """Builds the 'blockchain_data' artifact; the tool result is already a plain JSON object."""
+    return Artifact.model_construct(
+        name="blockchain_data",
+        parts=[DataPart.model_construct(data=result)],
+    )
+
+# Invariant error artifact, built once rather than per rejected task.
+NO_QUERY_ARTIFACT = make_error_artifact("No query provided.")
+
+# Queries whose tool call is unambiguous skip the LLM and go straight to MCP. A price
+# query must name Bitcoin and must not mention another asset (including Bitcoin forks
+# and wrapped tokens) or a point in time other than now; anything else ("price of
+# ethereum", "Bitcoin SV price", "price last week") goes to the LLM.
+PRICE_QUERY_PATTERN = re.compile(r"\bprice\b", re.IGNORECASE)
+BITCOIN_PATTERN = re.compile(r"\b(?:bitcoin|btc)\b", re.IGNORECASE)
+PRICE_QUERY_DISQUALIFIER_PATTERN = re.compile(
+    r"\b(?:"
+    r"eth(?:ereum)?|ether|sol(?:ana)?|doge(?:coin)?|litecoin|ltc|xrp|ripple|cardano|ada|"
+    r"usdt|tether|usdc|bnb|stocks?|shares?|"
+    r"cash|bch|sv|bsv|gold|wrapped|wbtc|"
+    r"yesterday|tomorrow|ago|last|next|week|month|year|history|historical|"
+    r"was|were|will|predict(?:ion)?|forecast|"
+    r"\d{4}"
+    r")\b",
+    re.IGNORECASE,
+)
+# Legacy (base58, P2PKH/P2SH) and bech32 mainnet addresses.
+BITCOIN_ADDRESS_PATTERN = re.compile(r"\b(?:[13][a-km-zA-HJ-NP-Z1-9]{25,34}|bc1[ac-hj-np-z02-9]{11,71})\b")
+
+# Upper bound on concurrent ADK (LLM) runs, so a burst of ambiguous queries cannot
+# starve direct tool calls and other tasks sharing the event loop.
+ADK_MAX_CONCURRENT_RUNS = int(os.getenv("ADK_MAX_CONCURRENT_RUNS", "8"))
+
+def match_direct_tool_call(user_query: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Maps a query to (tool_name, arguments) when no LLM is needed to pick the tool, else None."""
+    address_match = BITCOIN_ADDRESS_PATTERN.search(user_query)
+    if address_match:
+        return "get_address_balance", {"address": address_match.group(0)}
+    if (
+        PRICE_QUERY_PATTERN.search(user_query)
+        and BITCOIN_PATTERN.search(user_query)
+        and not PRICE_QUERY_DISQUALIFIER_PATTERN.search(user_query)
+    ):
+        return "get_bitcoin_price", {}
+    return None
+
+UNEXPECTED_TOOL_RESPONSE_ERROR = "Unexpected tool response format."
+
+def first_text(tool_result: CallToolResult) -> str:
+    """Returns the first text block of an MCP tool result, or an empty string."""
+    return next((content.text for content in tool_result.content if isinstance(content, TextContent)), "")
+
+def parse_tool_payload(result_text: str) -> Dict[str, Any]:
+    """Parses a tool's JSON text payload; anything but a JSON object is an unexpected response."""
+    try:
+        payload = orjson.loads(result_text)
+    except orjson.JSONDecodeError:
+        return {"error": UNEXPECTED_TOOL_RESPONSE_ERROR}
+    return payload if isinstance(payload, dict) else {"error": UNEXPECTED_TOOL_RESPONSE_ERROR}
+
+def tool_result_to_dict(tool_name: str, tool_result: CallToolResult) -> Dict[str, Any]:
+    """Maps an MCP tool result to the task's result dict: the tool's payload, or {"error": ...}."""
+    result_text = first_text(tool_result)
+    if tool_result.isError:
+        return {"error": result_text or f"Tool '{tool_name}' failed."}
+    return parse_tool_payload(result_text)
+
+def function_response_to_dict(tool_name: str, response: Any) -> Dict[str, Any]:
+    """Maps an ADK function response for an MCP tool to the same result dict as the direct path.
+
+    ADK may hand back the CallToolResult itself, its dumped dict, or either wrapped
+    as {"result": ...}; an already-parsed payload dict is passed through.
+    """
+    if isinstance(response, dict) and set(response) == {"result"}:
+        response = response["result"]
+    if isinstance(response, dict) and "content" in response:
+        try:
+            response = CallToolResult.model_validate(response)
+        except ValidationError:
+            return {"error": UNEXPECTED_TOOL_RESPONSE_ERROR}
+    if isinstance(response, CallToolResult):
+        return tool_result_to_dict(tool_name, response)
+    if isinstance(response, dict):
+        return response
+    return {"error": UNEXPECTED_TOOL_RESPONSE_ERROR}
+
+@functools.lru_cache(maxsize=256)
+def make_user_content(user_query: str) -> genai_types.Content:
+    """Builds the ADK input message; repeated queries reuse the same (never mutated) Content."""
+    return genai_types.Content(role='user', parts=[genai_types.Part(text=user_query)])
+
 class BlockchainInfoTaskManager(InMemoryTaskManager):
     """Handles A2A tasks by running the ADK BlockchainInfoAgent."""
 
-    def __init__(self, mcp_server_script_path: str):
+    def __init__(self, mcp_server_script_path: str, direct_tool_calls: bool = True):
         super().__init__()
         self.mcp_server_script_path = mcp_server_script_path
+        # When False, every task goes through the ADK agent (LLM dispatch).
+        self.direct_tool_calls = direct_tool_calls
+        self._mcp_tools: Dict[str, Any] = {}
+        # Direct tool calls in flight, so identical concurrent calls share one MCP request.
+        self._inflight_calls: Dict[Tuple[str, Tuple], asyncio.Future] = {}
+        self._adk_run_slots = asyncio.Semaphore(ADK_MAX_CONCURRENT_RUNS)
+        # One session service for all tasks; each task's session is deleted when it ends.
+        self._session_service = InMemorySessionService()
+        # The ADK agent, its MCP stdio connection and the Runner are created on first
+        # use and shared by all tasks; shutdown() tears them down when the server stops.
+        self._adk_runner_ready: Optional[asyncio.Future] = None
+        self._mcp_owner_task: Optional[asyncio.Task] = None
+        self._mcp_stop: Optional[asyncio.Event] = None
+        # Owner tasks of dropped connections, kept referenced until they finish closing.
+        self._retired_mcp_owner_tasks: Set[asyncio.Task] = set()
         logger.info(f"BlockchainInfoTaskManager initialized. Will use MCP server at: {self.mcp_server_script_path}")
 
-    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
-        """Handles A2A task by instantiating and running the ADK agent."""
-        task_params = request.params
-        task_id = task_params.id
-        session_id = task_params.sessionId
-        input_message = task_params.message
+    async def _get_adk_runner(self) -> Runner:
+        """Returns the shared ADK Runner, starting the MCP server on first call."""
+        ready = self._adk_runner_ready
+        if ready is None:
+            # Kept in a local: the owner task resets self._adk_runner_ready when it exits.
+            ready = self._adk_runner_ready = asyncio.get_running_loop().create_future()
+            self._mcp_stop = asyncio.Event()
+            self._mcp_owner_task = asyncio.create_task(self._hold_mcp_connection(ready, self._mcp_stop))
+        # Shielded so a cancelled task does not cancel startup for concurrent waiters.
+        return await asyncio.shield(ready)
 
-        logger.info(f"A2A Task Mgr: Received task '{task_id}' in session '{session_id}'")
+    async def _hold_mcp_connection(self, ready: asyncio.Future, stop: asyncio.Event):
+        """Opens the MCP connection and keeps it open until it is stopped.
 
-        task = await self.upsert_task(task_params)
-        task.status.state = TaskState.WORKING
-        await self.update_store(task_id, task.status, None)
+        The stdio client must be exited from the task that entered it, so one
+        long-lived task owns the exit stack instead of the request handlers.
+        It is stopped by shutdown(), or by _drop_mcp_connection() once a call
+        finds the stdio transport closed (e.g. the MCP subprocess died).
+        """
+        try:
+            logger.info("A2A Task Mgr: Creating shared ADK Agent and MCP connection...")
+            adk_agent, exit_stack = await create_agent_with_mcp_tools(self.mcp_server_script_path)
+            async with exit_stack:
+                self._mcp_tools = {tool.name: tool for tool in adk_agent.tools}
+                ready.set_result(Runner(
+                    agent=adk_agent,
+                    app_name=ADK_APP_NAME,
+                    session_service=self._session_service,
+                ))
+                await stop.wait()
+                logger.info("A2A Task Mgr: Closing shared MCP connection.")
+                self._mcp_tools = {}
+            logger.info("A2A Task Mgr: Shared MCP connection closed.")
+        except Exception as e:
+            logger.error(f"A2A Task Mgr: Shared MCP connection failed: {e}")
+            if not ready.done():
+                ready.set_exception(e)
+        finally:
+            # If this task ended on its own (e.g. a failed start), drop its state so
+            # the next task opens a fresh connection.
+            if self._adk_runner_ready is ready:
+                self._adk_runner_ready = self._mcp_owner_task = self._mcp_stop = None
+                self._mcp_tools = {}
+            if not ready.done():
+                # An exception rather than cancel(), so waiters get an error result
+                # instead of being cancelled themselves.
+                ready.set_exception(RuntimeError("MCP connection closed before it was ready."))
 
-        # Determine the user's intent from the message parts.
-        # This is a simplified logic. A more robust solution might use an LLM call here.
-        user_query = ""
-        if input_message.parts:
-            for part in input_message.parts:
-                if isinstance(part, TextPart) and part.text:
-                    user_query = part.text.strip()
-                    break
-        
-        if not user_query:
-            task.status.state = TaskState.FAILED
-            error_artifact = Artifact(name="error_details", parts=[DataPart(data={"error": "No query provided."})])
-            task.artifacts = [error_artifact]
-            await self.update_store(task_id, task.status, task.artifacts)
-            return SendTaskResponse(id=request.id, result=task)
+    def _drop_mcp_connection(self, stop: asyncio.Event):
+        """Stops the connection owning `stop`, if it is still the shared one, so the next task reconnects."""
+        if self._mcp_stop is not stop:
+            return # Already dropped, or replaced by a newer connection
+        logger.warning("A2A Task Mgr: Shared MCP connection is closed; reconnecting on next use.")
+        owner_task = self._mcp_owner_task
+        self._adk_runner_ready = self._mcp_owner_task = self._mcp_stop = None
+        self._mcp_tools = {}
+        if owner_task is not None:
+            self._retired_mcp_owner_tasks.add(owner_task)
+            owner_task.add_done_callback(self._retired_mcp_owner_tasks.discard)
+        stop.set()
+
+    async def startup(self):
+        """Opens the shared MCP connection up front so the first task does not pay for it."""
+        try:
+            await self._get_adk_runner()
+        except Exception:
+            logger.warning("A2A Task Mgr: MCP warm-up failed; the first task will retry.")
 
-        # --- Run the ADK Agent ---
+    async def shutdown(self):
+        """Shuts down the shared MCP connection, if one was opened."""
+        owner_task, stop = self._mcp_owner_task, self._mcp_stop
+        self._adk_runner_ready = self._mcp_owner_task = self._mcp_stop = None
+        if stop is not None:
+            stop.set()
+        if owner_task is not None:
+            await owner_task
+        if self._retired_mcp_owner_tasks:
+            await asyncio.gather(*self._retired_mcp_owner_tasks, return_exceptions=True)
+
+    async def _call_mcp_tool(self, task_id: str, tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+        """Calls an MCP tool directly on the shared session, skipping the LLM round trip."""
+        stop = None
+        try:
+            await self._get_adk_runner() # Ensures the MCP connection is up
+            stop = self._mcp_stop
+            tool = self._mcp_tools.get(tool_name)
+            if tool is None:
+                return {"error": f"Tool '{tool_name}' is not available."}
+            logger.info("A2A Task Mgr: Calling MCP tool '%s' directly for task '%s'...", tool_name, task_id)
+            tool_result = await tool.mcp_session.call_tool(tool_name, arguments=tool_args)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream) as tool_err:
+            # The stdio transport is gone; the owner task cannot notice that by itself.
+            logger.error("A2A Task Mgr: MCP connection lost calling '%s' for task '%s': %r", tool_name, task_id, tool_err)
+            if stop is not None:
+                self._drop_mcp_connection(stop)
+            return {"error": f"Failed to call tool '{tool_name}': MCP connection lost."}
+        except Exception as tool_err:
+            logger.exception("A2A Task Mgr: Error calling MCP tool '%s' for task '%s': %s", tool_name, task_id, tool_err)
+            return {"error": f"Failed to call tool '{tool_name}': {str(tool_err)}"}
+
+        result_dict = tool_result_to_dict(tool_name, tool_result)
+        if "error" not in result_dict:
+            logger.info("A2A Task Mgr: Successfully captured tool result: %s", result_dict)
+        return result_dict
+
+    async def _call_mcp_tool_coalesced(self, task_id: str, tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+        """Like _call_mcp_tool, but concurrent identical calls share one MCP request.
+
+        Only calls in flight are shared; results are not kept once the call finishes,
+        since the MCP server owns the result caches.
+        """
+        call_key = (tool_name, tuple(sorted(tool_args.items())))
+        inflight = self._inflight_calls.get(call_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._call_mcp_tool(task_id, tool_name, tool_args))
+            self._inflight_calls[call_key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight_calls.pop(call_key, None))
+        else:
+            logger.info("A2A Task Mgr: Joining in-flight '%s' call for task '%s'.", tool_name, task_id)
+        # Shielded so a cancelled caller, including the one that started the call,
+        # does not cancel or fail it for everyone else.
+        return await asyncio.shield(inflight)
+
+    async def _run_adk_agent(self, task_id: str, session_id: str, user_query: str) -> Dict[str, Any]:
+        """Lets the ADK agent (LLM) choose and call the tool; returns the first tool response."""
         adk_result_dict: Dict[str, Any] = {"error": "ADK agent execution failed."}
-        exit_stack = None
+        temp_adk_session = None
         try:
-            logger.info(f"A2A Task Mgr: Creating ADK Agent for task '{task_id}'...")
-            adk_agent, exit_stack = await create_agent_with_mcp_tools(self.mcp_server_script_path)
+            adk_runner = await self._get_adk_runner()
 
-            temp_session_service = InMemorySessionService()
-            temp_adk_session = temp_session_service.create_session(
-                app_name=f"adk_task_{task_id}",
+            temp_adk_session = self._session_service.create_session(
+                app_name=ADK_APP_NAME,
                 user_id=f"a2a_user_{session_id}",
                 session_id=f"adk_run_{task_id}",
                 state={}
             )
 
-            adk_runner = Runner(
-                agent=adk_agent,
-                app_name=temp_adk_session.app_name,
-                session_service=temp_session_service,
-            )
-
-            adk_content = genai_types.Content(role='user', parts=[genai_types.Part(text=user_query)])
-            logger.info(f"A2A Task Mgr: Running ADK agent for task '{task_id}'...")
+            adk_content = make_user_content(user_query)
+            logger.info("A2A Task Mgr: Running ADK agent for task '%s'...", task_id)
 
-            async for event in adk_runner.run_async(
+            adk_events = adk_runner.run_async(
                 session_id=temp_adk_session.id,
                 user_id=temp_adk_session.user_id,
                 new_message=adk_content
-            ):
-                if event.get_function_responses():
-                    for func_resp in event.get_function_responses():
-                        try:
-                            # The response is now a dictionary, not an object with attributes
-                            response_dict = func_resp.response
-                            if isinstance(response_dict, dict):
-                                adk_result_dict = response_dict
-                                logger.info(f"A2A Task Mgr: Successfully captured tool result: {adk_result_dict}")
-                            else:
-                                # Fallback if the structure is different
-                                adk_result_dict = {"error": "Unexpected tool response format."}
-                            break # Process first tool response
-                        except Exception as e:
-                            logger.error(f"Error processing tool response event: {e}", exc_info=True)
-                            adk_result_dict = {"error": "Internal error processing specialist response."}
-                            break
-            
-            logger.info(f"A2A Task Mgr: ADK agent run finished for task '{task_id}'.")
+            )
+            try:
+                async for event in adk_events:
+                    function_responses = event.get_function_responses()
+                    if not function_responses:
+                        continue
+                    # Normalized like the direct path, so the artifact shape (and an MCP
+                    # isError becoming a FAILED task) does not depend on which path ran.
+                    function_response = function_responses[0]
+                    adk_result_dict = function_response_to_dict(function_response.name, function_response.response)
+                    if "error" not in adk_result_dict:
+                        logger.info("A2A Task Mgr: Successfully captured tool result: %s", adk_result_dict)
+                    break # The first tool response is the task result; skip the rest of the run
+            finally:
+                await adk_events.aclose()
+
+            logger.info("A2A Task Mgr: ADK agent run finished for task '%s'.", task_id)
 
         except Exception as adk_err:
-            logger.exception(f"A2A Task Mgr: Error during ADK agent execution for task '{task_id}': {adk_err}")
+            logger.exception("A2A Task Mgr: Error during ADK agent execution for task '%s': %s", task_id, adk_err)
             adk_result_dict = {"error": f"Failed to execute ADK agent: {str(adk_err)}"}
         finally:
-            if exit_stack:
-                logger.info(f"A2A Task Mgr: Cleaning up MCP connection for task '{task_id}'.")
-                await exit_stack.aclose()
-                logger.info(f"A2A Task Mgr: MCP connection closed for task '{task_id}'.")
+            if temp_adk_session is not None:
+                # Sessions are per task; drop it so the shared service does not grow.
+                self._session_service.delete_session(
+                    app_name=temp_adk_session.app_name,
+                    user_id=temp_adk_session.user_id,
+                    session_id=temp_adk_session.id,
+                )
+        return adk_result_dict
+
+    async def _start_task(self, task_params: TaskSendParams) -> Task:
+        """Registers the task and marks it WORKING."""
+        logger.info("A2A Task Mgr: Received task '%s' in session '%s'", task_params.id, task_params.sessionId)
+        task = await self.upsert_task(task_params)
+        task.status.state = TaskState.WORKING
+        await self.update_store(task_params.id, task.status, None)
+        return task
+
+    async def _complete_task(self, task: Task, task_params: TaskSendParams) -> List[Artifact]:
+        """Runs the task to a terminal state and returns the artifacts it produced."""
+        task_id = task_params.id
+
+        # Determine the user's intent from the message parts.
+        # This is a simplified logic. A more robust solution might use an LLM call here.
+        user_query = next(
+            (part.text.strip() for part in (task_params.message.parts or ()) if isinstance(part, TextPart) and part.text),
+            "",
+        )
+
+        if not user_query:
+            task.status.state = TaskState.FAILED
+            artifacts = [NO_QUERY_ARTIFACT]
+            await self.update_store(task_id, task.status, artifacts)
+            return artifacts
+
+        direct_call = match_direct_tool_call(user_query) if self.direct_tool_calls else None
+        if direct_call is not None:
+            adk_result_dict = await self._call_mcp_tool_coalesced(task_id, *direct_call)
+        else:
+            async with self._adk_run_slots:
+                adk_result_dict = await self._run_adk_agent(task_id, task_params.sessionId, user_query)
 
         # --- Process Result and Finalize A2A Task ---
         if "error" not in adk_result_dict:
             task.status.state = TaskState.COMPLETED
-            result_artifact = Artifact(name="blockchain_data", parts=[DataPart(data=adk_result_dict)])
-            task.artifacts = [result_artifact]
-            logger.info(f"A2A Task Mgr: Task '{task_id}' COMPLETED successfully.")
+            artifacts = [make_result_artifact(adk_result_dict)]
+            logger.info("A2A Task Mgr: Task '%s' COMPLETED successfully.", task_id)
         else:
             task.status.state = TaskState.FAILED
             error_msg = adk_result_dict.get("error", "Unknown error from ADK Agent.")
-            logger.error(f"A2A Task Mgr: Task '{task_id}' FAILED. Reason: {error_msg}")
-            error_artifact = Artifact(name="error_details", parts=[DataPart(data={"error": error_msg})])
-            task.artifacts = [error_artifact]
+            logger.error("A2A Task Mgr: Task '%s' FAILED. Reason: %s", task_id, error_msg)
+            artifacts = [make_error_artifact(error_msg)]
 
-        await self.update_store(task_id, task.status, task.artifacts)
+        await self.update_store(task_id, task.status, artifacts)
+        return artifacts
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        """Handles an A2A task with a direct MCP tool call, or the ADK agent when the tool is not obvious."""
+        task = await self._start_task(request.params)
+        await self._complete_task(task, request.params)
         return SendTaskResponse(id=request.id, result=task)
 
     async def on_send_task_subscribe(
         self, request: SendTaskStreamingRequest
     ) -> Union[AsyncIterable[SendTaskStreamingResponse], JSONRPCResponse]:
-        """Streaming is not supported by this agent."""
-        logger.warning(f"A2A Task Manager: Received 'tasks/sendSubscribe', but streaming is not supported.")
-        return JSONRPCResponse(
-            id=request.id,
-            error=UnsupportedOperationError(message="Streaming is not supported by this agent.")
-        )
\ No newline at end of file
+        """Handles an A2A task like on_send_task, streaming WORKING, the artifacts and the final status."""
+        return self._stream_task(request.id, request.params)
+
+    async def _stream_task(self, request_id, task_params: TaskSendParams) -> AsyncIterable[SendTaskStreamingResponse]:
+        task = await self._start_task(task_params)
+        # Statuses are copied because the task's status is updated in place as it progresses.
+        yield SendTaskStreamingResponse(
+            id=request_id, result=TaskStatusUpdateEvent(id=task.id, status=task.status.model_copy())
+        )
+        artifacts = await self._complete_task(task, task_params)
+        for artifact in artifacts:
+            yield SendTaskStreamingResponse(id=request_id, result=TaskArtifactUpdateEvent(id=task.id, artifact=artifact))
+        yield SendTaskStreamingResponse(
+            id=request_id, result=TaskStatusUpdateEvent(id=task.id, status=task.status.model_copy(), final=True)
+        )
@@ -11,8 +11,9 @@ import asyncio
 import argparse
 import uuid
 import logging
-import json
-from typing import Optional
+import httpx
+import orjson
+from typing import List, Optional
 
 from common_impl.client import A2AClient
 from common_impl.types import (
@@ -24,7 +25,7 @@ from common_impl.types import (
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - A2A_TEST_CLIENT - %(message)s')
 logger = logging.getLogger(__name__)
 
-async def run_a2a_test(symbol: str, server_url: str, session_id: Optional[str] = None):
+async def run_a2a_test(a2a_client: A2AClient, symbol: str, server_url: str, session_id: Optional[str] = None):
     """
     Sends a task to the StockInfoAgent A2A server and prints the result.
     """
@@ -35,9 +36,6 @@ async def run_a2a_test(symbol: str, server_url: str, session_id: Optional[str] =
     task_id = uuid.uuid4().hex
     logger.info(f"Creating A2A task {task_id} for session {session_id} with symbol '{symbol}'")
 
-    # Create the A2A client targeting the StockInfoAgent server
-    a2a_client = A2AClient(url=server_url) # Pass the URL directly
-
     # Construct the A2A TaskSendParams
     task_params = TaskSendParams(
         id=task_id,
@@ -73,7 +71,7 @@ async def run_a2a_test(symbol: str, server_url: str, session_id: Optional[str] =
                         logger.info(f"- Artifact Name: {artifact.name or 'N/A'}")
                         for part in artifact.parts:
                             if isinstance(part, DataPart):
-                                logger.info(f"  DataPart Content: {json.dumps(part.data, indent=2)}")
+                                logger.info(f"  DataPart Content: {orjson.dumps(part.data, option=orjson.OPT_INDENT_2).decode()}")
                             elif isinstance(part, TextPart):
                                  logger.info(f"  TextPart Content: {part.text}")
                             else:
@@ -89,7 +87,7 @@ async def run_a2a_test(symbol: str, server_url: str, session_id: Optional[str] =
                          if artifact.name == "error_details":
                              for part in artifact.parts:
                                  if isinstance(part, DataPart):
-                                     logger.error(f"  {json.dumps(part.data, indent=2)}")
+                                     logger.error(f"  {orjson.dumps(part.data, option=orjson.OPT_INDENT_2).decode()}")
                                  else:
                                       logger.error(f"  Unexpected error artifact part: {part}")
                 elif task_result.status.message:
@@ -111,16 +109,37 @@ async def run_a2a_test(symbol: str, server_url: str, session_id: Optional[str] =
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}", exc_info=True)
 
+async def run_a2a_tests(symbols: List[str], server_url: str, session_id: Optional[str] = None):
+    """
+    Sends one task per symbol concurrently through one shared client and its connection pool.
+    """
+    async with httpx.AsyncClient(
+        # HTTP/2 is only negotiated over TLS (ALPN), so it is not requested for plain http.
+        http2=server_url.startswith("https://"),
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=32),
+    ) as http_client:
+        # Create the A2A client targeting the StockInfoAgent server
+        a2a_client = A2AClient(url=server_url, httpx_client=http_client)
+        await asyncio.gather(*(run_a2a_test(a2a_client, symbol, server_url, session_id) for symbol in symbols))
+
 # --- Script Entry Point ---
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test client for the StockInfoAgent A2A server.")
-    parser.add_argument("symbol", help="The stock ticker symbol to query (e.g., MSFT).")
+    parser.add_argument("symbols", nargs="+", help="One or more stock ticker symbols to query (e.g., MSFT AAPL).")
     parser.add_argument("--url", default="http://127.0.0.1:8001", help="The full URL of the A2A server endpoint.")
     parser.add_argument("--session", default=None, help="Optional session ID to use.")
 
     args = parser.parse_args()
 
+    # Prefer uvloop for the event loop (not available on Windows).
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.warning("uvloop not available. Falling back to the default asyncio event loop.")
+
     try:
-        asyncio.run(run_a2a_test(args.symbol, args.url, args.session))
+        asyncio.run(run_a2a_tests(args.symbols, args.url, args.session))
     except KeyboardInterrupt:
         logger.info("Test client stopped by user.")
\ No newline at end of file
@@ -0,0 +1,47 @@
+# tests/test_direct_tool_routing.py
+import sys
+import os
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+pytest.importorskip("google.adk")
+pytest.importorskip("mcp")
+
+from specialist_agents.blockchain_info_agent.task_manager import match_direct_tool_call
+
+
+@pytest.mark.parametrize("query", [
+    "What's the price of bitcoin?",
+    "BTC price",
+    "bitcoin price in euros",
+])
+def test_current_bitcoin_price_takes_direct_path(query):
+    assert match_direct_tool_call(query) == ("get_bitcoin_price", {})
+
+
+@pytest.mark.parametrize("query", [
+    "price",
+    "price of ethereum",
+    "bitcoin price last week",
+    "what was the bitcoin price",
+    "price of bitcoin in 2021",
+    "price of bitcoin cash",
+    "BCH price",
+    "Bitcoin SV price",
+    "BSV price",
+    "bitcoin gold price",
+    "wrapped bitcoin price",
+    "WBTC price",
+])
+def test_ambiguous_price_queries_go_to_llm(query):
+    assert match_direct_tool_call(query) is None
+
+
+def test_address_takes_direct_path():
+    address = "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"
+    assert match_direct_tool_call(f"balance of {address}") == ("get_address_balance", {"address": address})